@@ -0,0 +1,61 @@
+"""
+Local pointer to the unfinished task, so `clockout` and `status` don't have to look
+for it. `clockin` and `pickup` set it, `clockout` clears it, and commands changing
+the active task keep it in step.
+
+The task itself is stored under `storage.active_key` in its month, which serves as
+the remote copy: a machine without the pointer finds the task with a keyed get.
+"""
+# Local imports
+import os
+
+# Project modules
+from config import Config
+from records import TaskRecord
+import cache  # reading and writing JSON files
+import storage
+
+
+def _path() -> str:
+    return os.path.join(Config.cache_dir, "active.json")
+
+
+def load() -> tuple[str, TaskRecord] | None:
+    """The name of the Base holding the unfinished task and the task, if there is one."""
+    pointer = cache.read_json(_path())
+    if not pointer:
+        return None
+
+    try:
+        return pointer['base'], TaskRecord.from_item(pointer['item'])
+    except (KeyError, TypeError):  # written by an incompatible version
+        return None
+
+
+def save(base_name: str, record: TaskRecord) -> None:
+    cache.write_json(_path(), {'base': base_name, 'item': record.to_item()})
+
+
+def clear() -> None:
+    try:
+        os.remove(_path())
+    except FileNotFoundError:
+        pass
+
+
+def track(base_name: str, key: str, record: TaskRecord | None) -> None:
+    """
+    Updates the pointer after a write to the task with `key`, given as written, or
+    `None` if it was removed or moved out of the active slot. Writes to other tasks
+    are ignored.
+    """
+    if key != storage.active_key:
+        return
+
+    if (pointer := load()) is not None and pointer[0] != base_name:
+        return  # the active slot of another month
+
+    if record is None or record.hours is not None:
+        clear()
+    else:
+        save(base_name, record)
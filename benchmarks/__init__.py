@@ -0,0 +1,4 @@
+"""
+Benchmarks of the slow paths, run with `python -m benchmarks` from the repository
+root. See `benchmarks/run.py`.
+"""
@@ -0,0 +1,314 @@
+"""
+Times the slow paths of the CLI against generated months of tasks, with network
+calls stubbed out, and stores the results by commit so regressions show up when
+comparing one commit to the last.
+
+    python -m benchmarks                      # every benchmark and size
+    python -m benchmarks --size 1000 --only create_pdf
+"""
+# Non-local imports
+import typer
+from rich.table import Table
+
+# Local imports
+from collections.abc import Callable
+import contextlib
+import datetime as dt
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import time
+from typing import List
+
+# Project modules
+import bitly
+import cli
+import display
+import export
+import storage
+from config import Config
+from display import console
+from pdfclass import PDF
+from benchmarks import workload
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+# Sizes above which a benchmark is skipped, for paths that take minutes beyond them
+MAX_SIZES = {"display_tasks": 10_000, "create_table": 10_000}
+
+
+# ---- Stubs ----
+
+
+class _NoCache:
+    """Stands in for the short link cache so every link is shortened, every time."""
+    hits = misses = 0
+
+    def get(self, key: str) -> None:
+        return None
+
+    def set_many(self, values: dict) -> None:
+        pass
+
+
+def _stub_short_link(long_link: str) -> str:
+    return "https://bit.ly/" + hashlib.md5(long_link.encode()).hexdigest()[:7]
+
+
+@contextlib.contextmanager
+def offline():
+    """No Bitly requests or cache writes, and nothing printed to the terminal."""
+    original = bitly._request_short_link, bitly.short_link_cache, console.file
+    bitly._request_short_link, bitly.short_link_cache = _stub_short_link, _NoCache()
+
+    with open(os.devnull, "w") as devnull:
+        console.file = devnull
+        try:
+            yield
+        finally:
+            bitly._request_short_link, bitly.short_link_cache, console.file = original
+
+
+# ---- Benchmarks ----
+# Each takes the month's items and a scratch directory, does any setup, and returns
+# the function that's timed.
+
+
+def bench_reorder_dicts(items: list[dict], workdir: str) -> Callable:
+    return lambda: display._reorder_dicts(items)
+
+
+def bench_display_tasks(items: list[dict], workdir: str) -> Callable:
+    return lambda: display.display_tasks(items)
+
+
+def bench_display_page(items: list[dict], workdir: str) -> Callable:
+    return lambda: display.display_page(items, page=1, limit=Config.page_size)
+
+
+def bench_create_pdf(items: list[dict], workdir: str) -> Callable:
+    tasks = display._reorder_dicts(items)
+    path = os.path.join(workdir, "create_pdf.pdf")
+    return lambda: export.create_pdf(tasks, f"{workload.month}-{workload.year}", path)
+
+
+def _table_data(items: list[dict]) -> list[list[str]]:
+    data, _ = export._table_rows(display._reorder_dicts(items), {})
+    return data
+
+
+def _draw_table(method: str, data: list[list[str]]) -> None:
+    pdf = PDF(format='letter')
+    pdf.add_page()
+    pdf.set_font(Config.report_font, size=11)
+    getattr(pdf, method)(table_data=data, cell_width=[30, 50, 15, 93])
+
+
+def bench_render_table(items: list[dict], workdir: str) -> Callable:
+    data = _table_data(items)
+    return lambda: _draw_table("render_table", data)
+
+
+def bench_create_table(items: list[dict], workdir: str) -> Callable:
+    data = _table_data(items)
+    return lambda: _draw_table("create_table", data)
+
+
+def bench_export_tasks(items: list[dict], workdir: str) -> Callable:
+    return lambda: export.export_tasks(items, f"{workload.month}-{workload.year}", workdir)
+
+
+def bench_query_db(items: list[dict], workdir: str) -> Callable:
+    """Resolves a task name, ignoring case, from a local copy of the month."""
+    base = storage.SQLiteBase(
+        storage.month_name(workload.month, workload.year),
+        connection = sqlite3.connect(":memory:")
+    )
+    for item in items:
+        base.put({field: val for field, val in item.items() if field != "key"}, item["key"])
+
+    def run():
+        cli.work_log = base
+        assert cli._query_db(task=workload.probe_task.lower())
+
+    return run
+
+
+benchmarks: dict[str, Callable] = {
+    name.removeprefix("bench_"): func for name, func in globals().items()
+    if name.startswith("bench_")
+}
+
+
+def time_benchmark(setup: Callable, items: list[dict], repeats: int) -> float:
+    """Best time of `repeats` runs, in seconds."""
+    with tempfile.TemporaryDirectory() as workdir, offline():
+        original_work_log = cli.work_log
+        try:
+            run = setup(items, workdir)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+        finally:
+            cli.work_log = original_work_log
+
+    return min(timings)
+
+
+def run_benchmarks(
+    sizes: list[int], 
+    names: list[str] | None = None, 
+    repeats: int = 3, 
+    seed: int = 0
+) -> dict[str, dict[str, float | None]]:
+    """
+    Times each benchmark at each size, ex. `{'create_pdf': {'1000': 0.25}}`. Sizes
+    over a benchmark's limit are `None`. The largest months are only timed once.
+    """
+    results = {name: {} for name in names or benchmarks}
+    for size in sizes:
+        items = workload.generate_month(size, seed)
+        for name in results:
+            if size > MAX_SIZES.get(name, size):
+                results[name][str(size)] = None
+                continue
+
+            results[name][str(size)] = time_benchmark(
+                benchmarks[name], items, repeats if size < 100_000 else 1
+            )
+
+    return results
+
+
+# ---- Results ----
+
+
+def current_commit() -> str:
+    """Short hash of HEAD, marked dirty if there are uncommitted changes."""
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_DIR, capture_output=True, text=True
+        ).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit + ("-dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def save_results(results: dict, commit: str) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{commit}.json")
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "commit": commit,
+                "time": dt.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "results": results
+            },
+            file,
+            indent = 2
+        )
+    return path
+
+
+def load_previous(commit: str, compare: str | None = None) -> dict | None:
+    """Results of `compare`, or else the latest results saved by another commit."""
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+
+    if compare is None:
+        saved = [
+            os.path.join(RESULTS_DIR, file) for file in os.listdir(RESULTS_DIR)
+            if file.endswith(".json") and file != f"{commit}.json"
+        ]
+        if not saved:
+            return None
+        path = max(saved, key=os.path.getmtime)
+    else:
+        path = os.path.join(RESULTS_DIR, f"{compare}.json")
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def display_results(results: dict, previous: dict | None, threshold: float) -> int:
+    """Prints a table of results against `previous`, returning how many regressed."""
+    title = "Benchmarks" + (f" against {previous['commit']}" if previous else "")
+    table = Table(title=title)
+    table.add_column("Benchmark", style=Config.colors['task'])
+    table.add_column("Tasks", justify="right")
+    table.add_column("Seconds", style=Config.colors['hours'], justify="right")
+    table.add_column("Previous", justify="right")
+    table.add_column("Change", justify="right")
+
+    regressions = 0
+    for name, by_size in results.items():
+        for size, seconds in by_size.items():
+            before = (previous or {}).get("results", {}).get(name, {}).get(size)
+            if seconds is None:
+                table.add_row(name, f"{int(size):,}", "skipped", "", "")
+                continue
+
+            change = ""
+            if before:
+                ratio = seconds / before - 1
+                regressed = ratio > threshold
+                regressions += regressed
+                color = "red" if regressed else "green" if ratio < -threshold else "white"
+                change = f"[{color}]{ratio:+.0%}[/{color}]"
+
+            table.add_row(
+                name, 
+                f"{int(size):,}", 
+                f"{seconds:.4f}", 
+                f"{before:.4f}" if before else "", 
+                change
+            )
+
+    console.print(table)
+    return regressions
+
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    size: List[int] = typer.Option(
+        list(workload.sizes),
+        help = "Number of tasks in the generated month. Repeat for several sizes."
+    ),
+    only: List[str] = typer.Option(
+        [],
+        help = f"Run only this benchmark. Repeat for several: {', '.join(benchmarks)}."
+    ),
+    repeats: int = typer.Option(3, help="Runs of each benchmark, keeping the best."),
+    seed: int = typer.Option(0, help="Seed of the generated months."),
+    compare: str = typer.Option(
+        None,
+        help = "Commit to compare against. Defaults to the last one benchmarked."
+    ),
+    threshold: float = typer.Option(0.2, help="Slowdown flagged as a regression, ex. 0.2."),
+    save: bool = typer.Option(True, help="Store the results under benchmarks/results.")
+):
+    """Times the slow paths against generated months of tasks."""
+    if unknown := [name for name in only if name not in benchmarks]:
+        raise typer.BadParameter(f"Unknown benchmarks: {', '.join(unknown)}.")
+
+    commit = current_commit()
+    results = run_benchmarks(size, only or None, repeats, seed)
+    regressions = display_results(results, load_previous(commit, compare), threshold)
+
+    if save:
+        console.print(f"Saved to {os.path.relpath(save_results(results, commit))}.")
+
+    if regressions:
+        raise typer.Exit(1)
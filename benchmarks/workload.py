@@ -0,0 +1,97 @@
+"""
+Seeded generator of realistic months of tasks, for benchmarks and tests. The same
+seed and size always produce the same month.
+"""
+# Local imports
+import datetime as dt
+import random
+import string
+
+
+# Workload sizes benchmarked by default
+sizes: tuple[int] = (10, 1_000, 10_000, 100_000)
+
+# Month every workload is generated in
+month, year = 8, 2022
+
+# Logged exactly once in every workload, so looking it up always resolves
+probe_task = "Submit monthly invoice"
+
+_verbs = (
+    "Review", "Write", "Draft", "Edit", "Research", "Plan", "Debug", "Prepare",
+    "Present", "Organize", "Refactor", "Outline", "Record", "Summarize"
+)
+_subjects = (
+    "weekly report", "client proposal", "pull request", "onboarding docs",
+    "budget sheet", "marketing plan", "interview notes", "release notes",
+    "sales deck", "meeting agenda", "user survey", "grant application",
+    "data pipeline", "newsletter", "product roadmap", "research paper"
+)
+_url_hosts = (
+    "https://docs.google.com/document/d/{id}/edit?usp=sharing",
+    "https://drive.google.com/file/d/{id}/view?usp=share_link",
+    "https://github.com/example-org/example-repo/pull/{num}/files#diff-{id}",
+    "https://www.notion.so/workspace/{id}?pvs=4&p={num}"
+)
+_notes = (
+    "Sent by email", "Shared in the team channel", "Printed and handed in",
+    "Uploaded to the shared drive", "Discussed in the weekly meeting"
+)
+
+
+def _random_id(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
+
+def _task_names(rng: random.Random, count: int) -> list[str]:
+    """
+    Distinct task names, about one for every three tasks so names repeat, as they
+    do when a task is picked up again.
+    """
+    names = [f"{verb} {subject}" for verb in _verbs for subject in _subjects]
+    rng.shuffle(names)
+    needed = max(1, count // 3)
+    return [
+        names[idx % len(names)] + (f" {idx // len(names) + 1}" if idx >= len(names) else "")
+        for idx in range(needed)
+    ]
+
+
+def _deliverable(rng: random.Random) -> str | None:
+    """No deliverable, a long link, or a short note."""
+    roll = rng.random()
+    if roll < 0.2:
+        return None
+    elif roll < 0.6:
+        return rng.choice(_url_hosts).format(id=_random_id(rng, 44), num=rng.randint(1, 9999))
+    return rng.choice(_notes)
+
+
+def generate_month(count: int, seed: int = 0) -> list[dict]:
+    """
+    `count` task items of a single month, as they're stored: with dates in the
+    configured format, long links and notes as deliverables, repeated task names,
+    about one in twenty tasks unfinished, and `probe_task` once. Items are in insertion (key) order,
+    not by date.
+    """
+    rng = random.Random(f"{seed}-{count}")
+    names = _task_names(rng, count)
+    start = dt.datetime(year, month, 1)
+    minutes_in_month = 31 * 24 * 60
+
+    items = []
+    for idx in range(count):
+        unfinished = rng.random() < 0.05
+        date = start + dt.timedelta(minutes=rng.randrange(minutes_in_month))
+        items.append(
+            {
+                "Date": date.strftime("%Y-%m-%d %H-%M"),
+                "Task": rng.choice(names),
+                "Hours": None if unfinished else round(rng.uniform(0.1, 6), 2),
+                "Deliverable": None if unfinished else _deliverable(rng),
+                "key": f"{idx:06d}" + _random_id(rng, 6).lower()
+            }
+        )
+
+    items[0]["Task"] = probe_task
+    return items
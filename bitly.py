@@ -1,23 +1,72 @@
 import requests
+import concurrent.futures
+
 import keys
+import cache
+import profiling
+import sessions
+from config import Config
 
 
-def bitly(long_link: str) -> str:
-    """Shortens link using the bitly API."""
-    if not isinstance(long_link, str):
-        raise Exception("You must provide a string.")
+# Short links already created by Bitly, by long link
+short_link_cache = cache.PersistentLRU("short_links", Config.max_short_links)
+
 
+def _request_short_link(long_link: str) -> str:
+    """Shortens a link with the Bitly API, returning it unchanged if that fails."""
     headers = {
         'Authorization': f'Bearer {keys.Bitly.access_token}',
         'Content-Type': 'application/json'
     }
 
     data = ' {"long_url": "' + long_link + '" } '
-    
-    response = requests.post(url="https://api-ssl.bitly.com/v4/shorten", headers=headers, data=data)
+
+    try:
+        response = sessions.request(
+            "POST", "https://api-ssl.bitly.com/v4/shorten", headers=headers, data=data
+        )
+    except requests.RequestException:
+        return long_link
+    profiling.count_request("Bitly", len(data), len(response.content))
 
     if response.status_code != 200:
         return long_link
 
     return response.json()['link']
 
+
+@profiling.timed("bitly")
+def shorten_links(long_links: list[str]) -> dict[str, str]:
+    """
+    Shortens many links at once, returning a mapping of long links to short ones.
+    Cached links cost no requests, and the rest are requested concurrently with
+    at most `bitly_workers` (config.ini) at a time.
+    """
+    if not all(isinstance(long_link, str) for long_link in long_links):
+        raise Exception("You must provide a string.")
+
+    short_links = {}
+    for long_link in dict.fromkeys(long_links):  # distinct, in order
+        if (cached := short_link_cache.get(long_link)) is not None:
+            short_links[long_link] = cached
+
+    missing = [long_link for long_link in dict.fromkeys(long_links) if long_link not in short_links]
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(Config.bitly_workers) as executor:
+            requested = dict(zip(missing, executor.map(_request_short_link, missing)))
+
+        # Failed requests fall back to the long link and aren't cached
+        short_link_cache.set_many(
+            {long_link: short for long_link, short in requested.items() if short != long_link}
+        )
+        short_links.update(requested)
+
+    return short_links
+
+
+def bitly(long_link: str) -> str:
+    """Shortens link using the bitly API."""
+    if not isinstance(long_link, str):
+        raise Exception("You must provide a string.")
+
+    return shorten_links([long_link])[long_link]
@@ -0,0 +1,235 @@
+"""
+Persistent on-disk caches. Monthly Bases are cached as full snapshots: reads are
+served locally while the cached copy is fresh, writes made through the CLI update
+it, and closed months (any month before the current one) are cached permanently.
+Results of API calls, like title capitalizations, are kept in size-bounded LRU files.
+"""
+# Local imports
+from collections import OrderedDict
+import json
+import os
+import time
+
+# Project modules
+from config import Config
+import storage
+
+
+# Set by the `--refresh` option to revalidate every Base on its first read
+refresh: bool = False
+
+# Bases revalidated during the current command, cleared as each command starts
+refreshed: set[str] = set()
+
+# Set by `shell` so a month fetched once stays fresh for the rest of the session
+pinned: bool = False
+
+
+def read_json(path: str, default=None):
+    """Reads a JSON file, returning `default` if it's missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path: str, data) -> None:
+    """Writes JSON atomically so an interrupted command can't corrupt the cache."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def is_closed_month(name: str) -> bool:
+    """Whether Base `name`, ex. `work_log_7_2022`, is for a month that has ended."""
+    if (month_year := storage.month_of(name)) is None:
+        return False
+
+    month, year = month_year
+    return (year, month) < (Config.year, Config.month)
+
+
+class CachedBase(storage.Base):
+    """
+    Read-through cache in front of another Base. The cached copy is a full
+    snapshot of the month, so queries, gets and pages are all answered locally.
+    """
+    def __init__(self, base: storage.Base):
+        super().__init__(base.name)
+        self._base = base
+        self._path = os.path.join(Config.cache_dir, "months", f"{base.name}.json")
+        self._permanent = is_closed_month(base.name)
+        self._items: dict[str, dict] | None = None
+        self._fetched_at: float = 0
+        self._fetched_here = False
+        self._file_stamp: tuple[int, int] | None = None
+
+    def _fresh(self) -> bool:
+        if refresh and self.name not in refreshed:
+            return False
+        if self._permanent or (pinned and self._fetched_here):
+            return True
+        return time.time() - self._fetched_at < Config.cache_ttl
+
+    def _stamp(self) -> tuple[int, int] | None:
+        """Modification time and size of the cached copy on disk."""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> dict[str, dict] | None:
+        """
+        Reads the cached copy from disk, and again whenever another process, ex.
+        a command run alongside the daemon, has written it since.
+        """
+        stamp = self._stamp()
+        if self._items is None or stamp != self._file_stamp:
+            self._file_stamp = stamp
+            cached = read_json(self._path, default={})
+            self._items = cached.get('items')
+            self._fetched_at = cached.get('fetched_at', 0)
+        return self._items
+
+    def _load(self) -> dict[str, dict]:
+        """Returns the cached items, fetching the whole month if they're stale."""
+        if self._read() is None or not self._fresh():
+            self._revalidate()
+        return self._items
+
+    def _revalidate(self) -> None:
+        self._items = {item['key']: item for item in self._base.iterate()}
+        self._fetched_at = time.time()
+        self._fetched_here = True
+        if refresh:
+            refreshed.add(self.name)
+        self._save()
+
+    def _save(self) -> None:
+        write_json(self._path, {'fetched_at': self._fetched_at, 'items': self._items})
+        self._file_stamp = self._stamp()
+
+    def get(self, key: str) -> dict | None:
+        # A single item is read remotely, rather than fetching the whole month, if
+        # the copy is stale. The active task is always read remotely, since another
+        # machine may have clocked in or out.
+        if key != storage.active_key and self._read() is not None and self._fresh():
+            item = self._items.get(key)
+            return dict(item) if item else None
+
+        item = self._base.get(key)
+        if (items := self._read()) is not None:
+            if item:
+                items[key] = item
+            else:
+                items.pop(key, None)
+            self._save()
+        return item
+
+    def put(self, data: dict, key: str = None) -> dict:
+        item = self._base.put(data, key)
+        if (items := self._read()) is not None:
+            items[item['key']] = item
+            self._save()
+        return item
+
+    def insert(self, data: dict, key: str) -> dict:
+        # Always checked remotely, where other machines' writes are visible
+        item = self._base.insert(data, key)
+        if (items := self._read()) is not None:
+            items[item['key']] = item
+            self._save()
+        return item
+
+    def put_many(self, items: list[dict]) -> list[dict]:
+        try:
+            stored = self._base.put_many(items)
+        except storage.PutManyError as e:
+            self._cache_stored(e.stored)
+            raise
+        self._cache_stored(stored)
+        return stored
+
+    def _cache_stored(self, stored: list[dict]) -> None:
+        if (cached := self._read()) is not None:
+            cached.update((item['key'], item) for item in stored)
+            self._save()
+
+    def fetch(
+        self,
+        query: dict | list[dict] = None,
+        limit: int = 1000,
+        last: str = None
+    ) -> storage.FetchResponse:
+        # Deta query operators, ex. `Hours?gt`, aren't evaluated locally
+        sub_queries = query if isinstance(query, list) else [query or {}]
+        if any('?' in field for sub_query in sub_queries for field in sub_query):
+            return self._base.fetch(query, limit, last)
+
+        items = [
+            dict(item) for key, item in sorted(self._load().items())
+            if (last is None or key > last) and storage.matches(item, query)
+        ]
+        if len(items) > limit:
+            return storage.FetchResponse(items[:limit], last=items[limit - 1]['key'])
+        return storage.FetchResponse(items)
+
+    def delete(self, key: str) -> None:
+        self._base.delete(key)
+        if (items := self._read()) is not None and key in items:
+            del items[key]
+            self._save()
+
+    def update(self, updates: dict, key: str) -> None:
+        self._base.update(updates, key)
+        if (items := self._read()) is not None and key in items:
+            storage.apply_updates(items[key], updates)
+            self._save()
+
+
+class PersistentLRU:
+    """
+    String mapping persisted as a JSON file, evicting the least recently used
+    entries past `max_size`. The file is read on first use and written on every
+    change. Counts hits and misses for reporting.
+    """
+    def __init__(self, name: str, max_size: int):
+        self.path = os.path.join(Config.cache_dir, f"{name}.json")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] | None = None
+
+    @property
+    def entries(self) -> OrderedDict[str, str]:
+        if self._entries is None:
+            self._entries = OrderedDict(read_json(self.path, default={}))
+        return self._entries
+
+    def get(self, key: str) -> str | None:
+        if (value := self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def set_many(self, values: dict[str, str]) -> None:
+        if not values:
+            return
+
+        self.entries.update(values)
+        for key in values:
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        write_json(self.path, self.entries)
+
+    def set(self, key: str, value: str) -> None:
+        self.set_many({key: value})
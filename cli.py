@@ -3,25 +3,30 @@ Define the CLI.
 """
 # Non-local imports
 import typer # cli
-import deta  # database 
 
 # local imports
 import datetime as dt  # current time and time calculations
+import itertools  # peeking into fetched items
+import os  # checking files to import
 
 # Project modules
-import keys  # deta auth
-from display import display_tasks, console  # printing tasks
+import storage  # deta or sqlite
+import cache  # local copies of deta months
+from display import display_tasks, display_month_totals, console  # printing tasks
+import display  # paging
 from config import Config
-from export import export_tasks  # exporting tasks to csv
+from records import TaskRecord  # tasks stored by clockin and pickup
 import utils  # title capitalization
+import lookup  # resolving task names
+import timestamps  # parsing and formatting dates
+import profiling  # --profile
+import active  # pointer to the unfinished task
+import summary  # monthly totals
+import search  # full-text index
 
-# Debugging with the Rich traceback
-from rich import traceback; traceback.install()
 
-
-# Deta
-deta_client = deta.Deta(keys.Deta.project_key)
-work_log = deta_client.Base(Config.current_db)
+# Database
+work_log = storage.base(Config.current_db)
 
 
 # Item types
@@ -47,20 +52,56 @@ app = typer.Typer(
 )
 
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    refresh: bool = typer.Option(
+        False,
+        help = "Ignore locally cached months and fetch them again from Deta."
+    ),
+    profile: bool = typer.Option(
+        False,
+        envvar = "LOGHOURS_PROFILE",
+        help = "Print where the command spent its time, requests, and memory."
+    ),
+    profile_output: str = typer.Option(
+        None,
+        envvar = "LOGHOURS_PROFILE_OUTPUT",
+        help = "Write the profile to this JSON trace file instead of printing it."
+    )
+):
+    # No docstring, so the app's help text is used
+    cache.refresh = refresh
+    cache.refreshed.clear()
+
+    if profile or profile_output:
+        profiling.start(profile_output)
+        ctx.call_on_close(profiling.report)
+
+
+@profiling.timed("query_db")
 def _query_db(
     task: str = None, 
     key: str = None, 
     only_unfinished: bool = False,
     prioritize_undelivered: bool = False,
-    prioritize_delivered: bool = False
+    prioritize_delivered: bool = False,
+    use_closest: bool = False
 ) -> dict | bool:
     """
     Checks the database for an item matching the task name, the task title,
-    or using the key directly if it's provided. 
+    or using the key directly if it's provided. The month is fetched once and
+    names are resolved locally, ignoring case. A name that isn't found, ex. with a 
+    typo, can resolve to the closest name in the month if one clearly stands out, and 
+    otherwise the closest few are listed.
 
     If there was an error finding the item due to an invalid task name or invalid key,
     prints the error using click. 
 
+    The closest name is only used in place of the query if `use_closest` is `True`,
+    which only commands that don't write should set. Otherwise, and for names that 
+    differ from the query in their numbers, the closest names are listed instead.
+
     If `prioritize_undelivered` is `True`, if there are multiple occurrences of the same 
     task name, but only one has no delivery, the single undelivered task will be 
     returned without causing an error. 
@@ -82,7 +123,7 @@ def _query_db(
 
     # Key is given
     if key is not None:
-        db_item = work_log.get(key)
+        db_item = work_log.get_record(key)
         if not db_item:
             console.print(
                 f"Invalid [{Config.colors['key']}]key[/{Config.colors['key']}]. "
@@ -92,17 +133,17 @@ def _query_db(
         else:
             return db_item
 
+    # Fetch the month once and resolve everything locally
+    items = list(work_log.records())
+    index = lookup.TaskIndex(items)
+
     # Clockout - only find the single unfinished task
     if only_unfinished:
-        items = work_log.fetch(
-            {
-                'Hours': None
-            }
-        ).items
+        unfinished = index.unfinished()
 
-        if len(items) == 1:
-            return items[0]
-        elif len(items) == 0:
+        if len(unfinished) == 1:
+            return unfinished[0]
+        elif len(unfinished) == 0:
             console.print("")
             console.print(
                 f"There are no unfinished "
@@ -110,70 +151,131 @@ def _query_db(
             )
             console.print("")
             return False
+        elif not task:
+            console.print("")
+            console.print(
+                "Multiple unfinished items found. "
+                f"Please specify the [{Config.colors['key']}]key[/{Config.colors['key']}]."
+            )
+            display_tasks(unfinished)
+            return False
 
-    fetch_title = False
-    items = work_log.fetch(
-        {
-            'Task': task
-        }
-    ).items
+    matches = index.find(task)
 
-    # Try looking for tasks with title case
-    if len(items) == 0:
-        items = work_log.fetch(
-            {
-                'Task': utils.capitalize_title(task)
-            }
-        ).items
-        fetch_title = True
+    # Fall back to the closest name, for typos and partial names
+    if len(matches) == 0:
+        similar = index.similar(task)
+        if use_closest and (name := lookup.best_match(similar, task)) is not None:
+            console.print("")
+            console.print(
+                f"Using [{Config.colors['task']}]{name}[/{Config.colors['task']}], "
+                f"the closest match to '{task}'."
+            )
+            matches = index.find(name)
 
-    if len(items) == 0:  # if none were found after trying title case
+    if len(matches) == 0:  # if none were found after trying title case
         console.print("")
         console.print(
             "No items found. "
             f"Correct the [{Config.colors['task']}]query[/{Config.colors['task']}] "
             f"or specify the [{Config.colors['key']}]key[/{Config.colors['key']}]."
         )
-        display_tasks(work_log.fetch().items)
+        if similar:
+            console.print("Closest task names:")
+            for name, _ in similar:
+                console.print(f"  [{Config.colors['task']}]{name}[/{Config.colors['task']}]")
+        console.print("")
         return False
 
-    if len(items) > 1:
-        if prioritize_undelivered:
-            # Check if only one is undelivered
-            query_undelivered = work_log.fetch(
-                {
-                    'Task': utils.capitalize_title(task) if fetch_title else task,
-                    'Deliverable': None
-                }
-            ).items
-            if len(query_undelivered) == 1:
-                return query_undelivered[0]
-
-        if prioritize_delivered:
-            delivered_items = []
-            for item in items:
-                if item['Deliverable']:
-                    delivered_items.append(item)
-            if len(delivered_items) == 1:
-                return delivered_items[0]
+    db_item = lookup.prioritize(
+        matches,
+        prioritize_undelivered = prioritize_undelivered,
+        prioritize_delivered = prioritize_delivered
+    )
 
+    if db_item is None:
         console.print("")
         console.print(
             "Multiple items found. "
             f"Please specify the [{Config.colors['key']}]key[/{Config.colors['key']}]."
         )
-        display_tasks(work_log.fetch().items)
+        display_tasks(matches)
         return False
 
-    db_item = items[0]
     return db_item
 
 
+def _record_write(
+    base: storage.Base,
+    removed: list[TaskRecord] = (),
+    added: list[TaskRecord] = ()
+) -> None:
+    """
+    Brings the month's summary and search index up to date after a write replaced 
+    the `removed` tasks with the `added` ones.
+    """
+    summary.record(base, removed, added)
+    search.record(base.name, removed, added)
+
+
+def _put_task(base: storage.Base, task: TaskRecord) -> None:
+    """
+    Writes `task`, keeping the active pointer in step. A finished task in the active
+    slot is moved to a new key, freeing the slot for the next clockin.
+    """
+    if task.key == storage.active_key and task.hours is not None:
+        task.key = storage.generate_key()
+        base.put(task.to_item())
+        base.delete(storage.active_key)
+        active.track(base.name, storage.active_key, None)
+    else:
+        base.put(task.to_item())
+        active.track(base.name, task.key, task)
+
+
+# Paging options shared by `log` and `previewmonth`
+page_option = typer.Option(
+    None,
+    min = 1,
+    help = "Show only this page of tasks, counting from 1."
+)
+limit_option = typer.Option(
+    None,
+    min = 1,
+    help = f"Tasks per page. Defaults to {Config.page_size}, set in config.ini."
+)
+pager_option = typer.Option(
+    False,
+    help = "Page through the tasks interactively."
+)
+
+
+def _display_log(items, page: int = None, limit: int = None, pager: bool = False) -> None:
+    """
+    Displays every task in `items`, or with paging options, only one page at a time
+    so large months aren't laid out all at once.
+    """
+    if pager:
+        display.page_tasks(items, limit or Config.page_size)
+    elif page is not None or limit is not None:
+        display.display_page(items, page or 1, limit or Config.page_size)
+    else:
+        display_tasks(items)
+
+
 @app.command()
-def log():
-    """Displays a full log of all work hours. Is this in?"""
-    items = work_log.fetch().items
-    if len(items) == 0:
+def log(
+    page: int = page_option,
+    limit: int = limit_option,
+    pager: bool = pager_option
+):
+    """
+    Displays a full log of all work hours. Is this in?
+
+    Use `--page` and `--limit`, or `--pager`, to view a large log one page at a time.
+    """
+    items = work_log.records()
+    if (first := next(items, None)) is None:
         console.print("")
         console.print(
             f"No [{Config.colors['task']}]tasks[/{Config.colors['task']}] "
@@ -182,7 +284,7 @@ def log():
         console.print("")
         return
 
-    display_tasks(items)
+    _display_log(itertools.chain([first], items), page, limit, pager)
 
 
 @app.command()
@@ -236,24 +338,42 @@ def clockin(
     if hours == 0: hours = None
     if date.lower().strip() == "no": date = None
     if deliver.lower().strip() == "no": deliver = None
+    date_forced = date is not None
 
-    # Check for multiple unfinished tasks
-    tasks = work_log.fetch(
-        {
-            "Hours": None
-        }
-    ).items
+    # Push time backward if hours is given without a date
+    if hours is not None and date is None:
+        time_started = dt.datetime.now() - dt.timedelta(hours=hours)
+        date = timestamps.format(time_started)
 
-    if len(tasks) > 0:
-        console.print("")
-        console.print(
-            "You cannot start multiple unfinished "
-            f"[{Config.colors['task']}]tasks[/{Config.colors['task']}]."
-        )
-        console.print("")
-        return
+    # Determine date
+    if date is None:
+        date = timestamps.format(dt.datetime.now())
+
+    item = {
+        "Date": date,
+        "Task": task,
+        "Hours": hours,
+        "Deliverable": deliver
+    }
+
+    # Store the task. An unfinished task takes the active slot, which fails in the 
+    # same request if another task is already unfinished.
+    if hours is None:
+        try:
+            stored = work_log.insert(item, storage.active_key)
+        except storage.KeyExistsError:
+            console.print("")
+            console.print(
+                "You cannot start multiple unfinished "
+                f"[{Config.colors['task']}]tasks[/{Config.colors['task']}]."
+            )
+            console.print("")
+            return
+        active.save(work_log.name, TaskRecord.from_item(stored))
+    else:
+        stored = work_log.put(item)
+    _record_write(work_log, added=[TaskRecord.from_item(stored)])
 
-    # Store the task
     if hours is None:
         console.print("")
         console.print(
@@ -262,7 +382,7 @@ def clockin(
             f"'[{Config.colors['task']}]{task}[/{Config.colors['task']}]' "
             "to close this task."
         )
-    elif hours is not None and date is None:
+    elif hours is not None and not date_forced:
         console.print("")
         console.print(
             f"Logging [{Config.colors['task']}]{task}[/{Config.colors['task']}] for "
@@ -270,7 +390,7 @@ def clockin(
             f"starting [{Config.colors['hours']}]{hours}[/{Config.colors['hours']}] "
             "hours ago."
         )
-    elif hours is not None and date is not None:
+    elif hours is not None and date_forced:
         console.print("")
         console.print(
             f"Logging [{Config.colors['task']}]{task}[/{Config.colors['task']}] for "
@@ -281,25 +401,25 @@ def clockin(
     else:
         raise Exception("Don't know what to do in this case.")
 
-    # Determine date
-    if date is None:
-        date = dt.datetime.now().strftime(Config.dt_format)
+    console.print("")
 
-    # Push time backward if hours is given without a date
-    if hours is not None and date is None:
-        time_started = dt.datetime.now() - dt.timedelta(hours=hours)
-        date = time_started.strftime(Config.dt_format)
-
-    work_log.put(
-        {
-            "Date": date,
-            "Task": task,
-            "Hours": hours,
-            "Deliverable": deliver
-        }
-    )
 
-    console.print("")
+def _move_to_active_slot(db_task: TaskRecord) -> TaskRecord:
+    """
+    Moves a task left unfinished under another key, ex. by an older version, into 
+    the active slot of the current month, where it blocks other clock-ins. If the 
+    slot was taken in the meantime, the task is left where it is.
+    """
+    item = db_task.to_item()
+    del item['key']
+    try:
+        stored = TaskRecord.from_item(work_log.insert(item, storage.active_key))
+    except storage.KeyExistsError:
+        return db_task
+
+    work_log.delete(db_task.key)
+    _record_write(work_log, [db_task], [stored])
+    return stored
 
 
 @app.command()
@@ -328,8 +448,38 @@ def clockout(
     Deliver a task directly while clocking out with --deliver. If you use --hours, the 
     `hours` value provided is used instead of a standard calculation involving the 
     current time.
+
+    The task is found without a query: clocking in keeps a local pointer to its month,
+    and the task is read from the month's active slot by key. Use --key for any other 
+    task.
     """
-    db_task = _query_db(key=key, only_unfinished=True)
+    base = work_log
+    if key is not None:
+        db_task = _query_db(key=key)
+    elif (pointer := active.load()) is not None:
+        base_name, pointed = pointer
+        base = storage.base(base_name)  # may have been started last month
+
+        # Another machine may have clocked out, or out and in again, since
+        db_task = base.get_record(storage.active_key)
+        if db_task is None or (
+            (db_task.key, db_task.task, db_task.date)
+            != (pointed.key, pointed.task, pointed.date)
+        ):
+            active.clear()
+            console.print("")
+            console.print(
+                f"[{Config.colors['task']}]{pointed.task}[/{Config.colors['task']}] "
+                "was already clocked out elsewhere. Run clockout again, or use "
+                f"--[{Config.colors['key']}]key[/{Config.colors['key']}]."
+            )
+            console.print("")
+            return
+    elif (db_task := work_log.get_record(storage.active_key)) is None:
+        # Tasks left unfinished outside the active slot
+        if db_task := _query_db(only_unfinished=True):
+            db_task = _move_to_active_slot(db_task)
+
     if not db_task:
         return
 
@@ -343,19 +493,18 @@ def clockout(
         )
         return
 
+    before = TaskRecord.from_item(db_task.to_item())
+
     # Hours
     if hours is None:
-        time_delta = (
-            dt.datetime.now() - \
-                dt.datetime.strptime(db_task['Date'], Config.dt_format)
-        )
+        time_delta = dt.datetime.now() - db_task.started
         hours_delta = time_delta.total_seconds() / 3600
         hours = round(hours_delta, 2)
-    db_task['Hours'] = hours
+    db_task.hours = hours
 
     # Deliverable
     if deliver is not None:
-        db_task['Deliverable'] = deliver
+        db_task.deliverable = deliver
 
     console.print("")
     console.print(
@@ -363,11 +512,39 @@ def clockout(
         f"[{Config.colors['task']}]{db_task['Task']}[/{Config.colors['task']}] "
         f"for [{Config.colors['hours']}]{hours}[/{Config.colors['hours']}] hours.")
 
-    work_log.put(db_task)
+    _put_task(base, db_task)
+    _record_write(base, [before], [db_task])
 
     console.print("")
 
 
+@app.command()
+def status():
+    """
+    Shows whether you're clocked in, to which task, and for how long.
+
+    Reads the pointer kept by `clockin` and `pickup`, so it makes no requests. Tasks 
+    started on another machine aren't known here, so they aren't shown.
+    """
+    console.print("")
+    if (pointer := active.load()) is None:
+        console.print(
+            "You're not clocked in to any "
+            f"[{Config.colors['task']}]task[/{Config.colors['task']}] on this machine."
+        )
+        console.print("")
+        return
+
+    _, record = pointer
+    hours = round((dt.datetime.now() - record.started).total_seconds() / 3600, 2)
+    console.print(
+        f"Clocked in to [{Config.colors['task']}]{record.task}[/{Config.colors['task']}] "
+        f"for [{Config.colors['hours']}]{hours}[/{Config.colors['hours']}] hours, "
+        f"since [{Config.colors['date']}]{record.date}[/{Config.colors['date']}]."
+    )
+    console.print("")
+
+
 @app.command()
 def pickup(
     task: str = typer.Argument(
@@ -392,11 +569,35 @@ def pickup(
     if not db_item:
         return
 
-    new_start = dt.datetime.now() - dt.timedelta(hours=db_item['Hours'])
-    db_item['Date'] = new_start.strftime(Config.dt_format)
-    db_item['Hours'] = None
+    if db_item.hours is None:
+        console.print("")
+        console.print(
+            f"[{Config.colors['task']}]{db_item['Task']}[/{Config.colors['task']}] "
+            "is already unfinished. Clock out of it when you're done."
+        )
+        console.print("")
+        return
+
+    before = TaskRecord.from_item(db_item.to_item())
+    new_start = dt.datetime.now() - dt.timedelta(hours=db_item.hours)
+    db_item.date = timestamps.format(new_start)
+    db_item.hours = None
+
+    # Move the task into the active slot, unless another task is already in it
+    original_key = db_item.key
+    try:
+        stored = work_log.insert(db_item.to_item(), storage.active_key)
+    except storage.KeyExistsError:
+        console.print("")
+        console.print(
+            "You cannot pick up a task while another is unfinished. Clock out of it first."
+        )
+        console.print("")
+        return
+    work_log.delete(original_key)
+    active.save(work_log.name, TaskRecord.from_item(stored))
+    _record_write(work_log, [before], [TaskRecord.from_item(stored)])
 
-    work_log.put(db_item)
     console.print("")
     console.print(
         f"Continuing work on "
@@ -418,6 +619,8 @@ def removetask(key: str = typer.Argument(..., help="Task unique database key."))
         return
 
     work_log.delete(key)
+    active.track(work_log.name, key, None)
+    _record_write(work_log, removed=[task])
     console.print("")
     console.print(
         f"Removed task with key [{Config.colors['key']}]{key}[/{Config.colors['key']}]."
@@ -425,20 +628,85 @@ def removetask(key: str = typer.Argument(..., help="Task unique database key."))
     display_tasks(task)
 
 
+def _month_range_names(start: str, end: str) -> dict[str, str] | bool:
+    """
+    Base names for every month from `start` through `end`, by month (ex. '7-2022').
+    Prints the error and returns `False` if the range is invalid.
+    """
+    try:
+        months = utils.month_range(start, end)
+    except ValueError:
+        console.print("")
+        console.print(
+            f"Invalid range of months from [{Config.colors['date']}]{start}"
+            f"[/{Config.colors['date']}] to [{Config.colors['date']}]{end}"
+            f"[/{Config.colors['date']}]. Use the format '7-2022'."
+        )
+        console.print("")
+        return False
+
+    return {f"{month}-{year}": storage.month_name(month, year) for month, year in months}
+
+
 @app.command()
-def totalhours(payrate: float = typer.Option(None, help="Your hourly wage.")):
+def totalhours(
+    payrate: float = typer.Option(None, help="Your hourly wage."),
+    from_month: str = typer.Option(
+        None,
+        "--from",
+        help = "First month of a range to total, ex. '1-2022'."
+    ),
+    to_month: str = typer.Option(
+        None,
+        "--to",
+        help = "Last month of a range to total, ex. '12-2022'. Defaults to this month."
+    ),
+    by_task: bool = typer.Option(
+        False,
+        "--by-task",
+        help = "Break this month's hours down by task name."
+    )
+):
     """
     Calculates the total hours worked on all tasks.
 
     Proviate `payrate` to calculate your monthly pay.
+
+    Provide `--from` (and optionally `--to`) to total a range of months instead, 
+    like a quarter or a year. The months are read concurrently and broken 
+    down month by month.
+
+    Totals are read from each month's summary record, a single request per month. 
+    Run `reconcile` if they ever disagree with the log.
     """
-    tasks = work_log.fetch().items
+    if from_month or to_month:
+        names = _month_range_names(
+            from_month or to_month, to_month or f"{Config.month}-{Config.year}"
+        )
+        if not names:
+            return
+
+        month_summaries = storage.map_months(
+            lambda name: summary.load(storage.base(name)), list(names.values())
+        )
+        month_hours = {
+            monthyear: summary.hours(month_summaries[name])
+            for monthyear, name in names.items()
+        }
+        display_month_totals(month_hours, payrate)
+        console.print("")
+        return
 
-    hours = 0
-    for task in tasks:
-        for key, val in task.items():
-            if key == 'Hours' and val is not None:
-                hours += val
+    month_summary = summary.load(work_log)
+    hours = summary.hours(month_summary)
+
+    if by_task:
+        display_month_totals(
+            dict(sorted(summary.task_hours(month_summary).items())),
+            payrate,
+            title = "Hours Worked by Task",
+            label = "Task"
+        )
 
     console.print("")
     console.print(
@@ -455,6 +723,42 @@ def totalhours(payrate: float = typer.Option(None, help="Your hourly wage.")):
     console.print("")
 
 
+@app.command()
+def reconcile(
+    monthyear: str = typer.Argument(
+        None,
+        help = "Month whose summary to rebuild, ex. '7-2022'. Defaults to this month."
+    )
+):
+    """
+    Rebuilds a month's summary record from all of its tasks.
+
+    Every change made through the CLI keeps the summary up to date, but changes 
+    made elsewhere, ex. directly in Deta, aren't counted. The month is fetched 
+    again, ignoring the local cache.
+    """
+    if monthyear is None:
+        monthyear = f"{Config.month}-{Config.year}"
+    if monthyear[0] == '0':
+        monthyear = monthyear[1:]
+
+    month, year = monthyear.split('-')
+    cache.refresh = True
+    month_summary = summary.rebuild(storage.base(storage.month_name(month, year)))
+
+    console.print("")
+    console.print(
+        f"Rebuilt the summary of [{Config.colors['date']}]{monthyear}"
+        f"[/{Config.colors['date']}]: "
+        f"[{Config.colors['task']}]{month_summary['Tasks']}[/{Config.colors['task']}] tasks "
+        f"({month_summary['Unfinished']} unfinished, "
+        f"{month_summary['Undelivered']} undelivered) totaling "
+        f"[{Config.colors['hours']}]{summary.hours(month_summary):,.2f}"
+        f"[/{Config.colors['hours']}] hours."
+    )
+    console.print("")
+
+
 @app.command()
 def deliver(
     task: str = typer.Argument(
@@ -481,8 +785,11 @@ def deliver(
     if not db_item:
         return
 
-    db_item['Deliverable'] = item
-    work_log.put(db_item)
+    before = TaskRecord.from_item(db_item.to_item())
+    db_item.deliverable = item
+    work_log.put(db_item.to_item())
+    active.track(work_log.name, db_item.key, db_item)
+    _record_write(work_log, [before], [db_item])
 
     console.print("")
     console.print(
@@ -510,7 +817,7 @@ def deliverable(
     If the deliverable is determined to be a link, the link is automatically opened
     in your default browser.
     """
-    db_item = _query_db(task, key, prioritize_delivered=True)
+    db_item = _query_db(task, key, prioritize_delivered=True, use_closest=True)
     if not db_item: return
 
     deliverable_item: str = db_item['Deliverable']
@@ -521,7 +828,7 @@ def deliverable(
             "There is no "
             f"[{Config.colors['deliverable']}]deliverable[/{Config.colors['deliverable']}] "
             "for "
-            f"[{Config.colors['task']}]{task}[/{Config.colors['task']}]."
+            f"[{Config.colors['task']}]{db_item['Task']}[/{Config.colors['task']}]."
         )
         return
 
@@ -536,12 +843,75 @@ def deliverable(
         typer.launch(deliverable_item)
 
 
+@app.command(name="search")
+def search_tasks(
+    query: str = typer.Argument(
+        ...,
+        help = "Words to look for in task names and deliverables, links included."
+    ),
+    limit: int = typer.Option(
+        10,
+        min = 1,
+        help = "Most results to show."
+    ),
+    from_month: str = typer.Option(
+        None,
+        "--from",
+        help = "Only search from this month on, ex. '1-2022'."
+    )
+):
+    """
+    Finds tasks across every month by the words in their names and deliverables.
+
+    Results are ranked, best first: tasks matching more of the words, then rarer 
+    words, and words in the name before those in the deliverable. A word also 
+    matches longer words starting with it, ex. 'doc' matches 'docs'. Links are 
+    split into words too, so a search for 'figma' finds figma.com links.
+
+    Searches a local index of every month, kept up to date as you log. The first 
+    search builds it, looking back until a year without tasks, so use `--from` 
+    to include anything older.
+    """
+    names = None
+    if from_month is not None:
+        names = _month_range_names(from_month, f"{Config.month}-{Config.year}")
+        if not names:
+            return
+        names = list(names.values())
+
+    indexes = search.load_indexes(names)
+    hits = search.search(query, indexes, limit)
+
+    if not hits:
+        console.print("")
+        console.print(
+            f"No [{Config.colors['task']}]tasks[/{Config.colors['task']}] match "
+            f"'{query}'."
+        )
+        console.print("")
+        return
+
+    searched = sum(len(index.tasks) for index in indexes)
+    display.display_hits(
+        hits, caption=f"Best matches among {searched:,} tasks in {len(indexes)} months"
+    )
+    console.print("")
+
+
 @app.command()
 def previewmonth(
     monthyear: str = typer.Argument(
         ..., 
         help = "Month to preview, ex. '7-2022'."
-    )
+    ),
+    to_month: str = typer.Option(
+        None,
+        "--to",
+        help = "Preview every month from `monthyear` through this one, ex. '12-2022'."
+    ),
+    page: int = page_option,
+    limit: int = limit_option,
+    pager: bool = pager_option
 ):
     """
     Displays all tasks of a given month. This is useful when previewing the 
@@ -556,21 +926,41 @@ def previewmonth(
     
     The required `monthyear` parameter takes the format "7-2022" where 
     7 is July and 2022 is the year. No leading zeroes here. 
+
+    Provide `--to` to preview a range of months, fetched concurrently. Use `--page` 
+    and `--limit`, or `--pager`, to view a large month one page at a time.
     """
+    if to_month:
+        names = _month_range_names(monthyear, to_month)
+        if not names:
+            return
+
+        month_items = storage.fetch_months(list(names.values()))
+        if not any(month_items.values()):
+            console.print("")
+            console.print(f"No databases were found from '{monthyear}' to '{to_month}'.")
+            console.print("")
+            return
+
+        for items in month_items.values():
+            if items:
+                _display_log(items, page, limit, pager)
+        return
+
     # If user provides a leading 0
     if monthyear[0] == '0':
         monthyear = monthyear[1:]
 
     month, year = monthyear.split('-')
-    items = deta_client.Base(Config.db_basename + f"_{month}_{year}").fetch().items
+    items = storage.base(storage.month_name(month, year)).records()
 
-    if len(items) == 0:
+    if (first := next(items, None)) is None:
         console.print("")
         console.print(f"No database was found for '{monthyear}'.")
         console.print("")
         return
 
-    display_tasks(items)
+    _display_log(itertools.chain([first], items), page, limit, pager)
 
 
 @app.command()
@@ -582,6 +972,11 @@ def export(
     path: str = typer.Option(
         None,
         help = "Absolute path to the folder in which to export your documents."
+    ),
+    to_month: str = typer.Option(
+        None,
+        "--to",
+        help = "Export every month from `monthyear` through this one as one report."
     )
 ):
     """
@@ -606,7 +1001,41 @@ def export(
 
     If no optional path is provided, the files are exported to the current working
     directory (of your console session).
+
+    Provide `--to` to export a range of months, like a quarter or a year, as one 
+    packet: a single PDF with a section and subtotal per month and one shared 
+    appendix, plus one combined CSV, ex. "Work Log 1-2022 to 12-2022.zip". 
     """
+    if to_month:
+        names = _month_range_names(monthyear, to_month)
+        if not names:
+            return
+
+        with console.status(f"Generating a report from {monthyear} to {to_month}."):
+            month_items = storage.fetch_months(list(names.values()))
+            month_tasks = {
+                monthyear: month_items[name] 
+                for monthyear, name in names.items() if month_items[name]
+            }
+            if not month_tasks:
+                console.print("")
+                console.print(f"No databases were found from '{monthyear}' to '{to_month}'.")
+                console.print("")
+                return
+
+            from export import export_range  # fpdf is only loaded here
+            path = export_range(month_tasks, path=path)
+
+        console.print(
+            f"\nYour log has been exported to the current directory in PDF and CSV, "
+            "and zipped format. "
+        )
+        console.print(
+            f"'{path}.csv'\n'{path}.pdf'\n'{path}.zip'"
+        )
+        console.print("")
+        return
+
     with console.status(f"Generating a report for {monthyear}."):
         # If user provides a leading 0
         if monthyear[0] == '0':
@@ -615,16 +1044,17 @@ def export(
         # Parse the input
         month, year = monthyear.split('-')
 
-        db_lookup = Config.db_basename + f"_{month}_{year}"
-        db = deta_client.Base(db_lookup)
+        db = storage.base(storage.month_name(month, year))
 
-        items = db.fetch().items
-        if len(items) == 0:
+        items = db.records()
+        if (first := next(items, None)) is None:
             console.print("")
             console.print(f"No database was found for '{monthyear}'.")
             console.print("")
             return
+        items = itertools.chain([first], items)
 
+        from export import export_tasks  # fpdf is only loaded here
         path = export_tasks(items, monthyear=monthyear, path=path)
 
     console.print(
@@ -637,6 +1067,131 @@ def export(
     console.print("")
 
 
+@app.command(name="import")
+def import_tasks(
+    file: str = typer.Argument(
+        ...,
+        help = "CSV (as written by `export`) or JSONL file of tasks to import."
+    ),
+    titlecase: bool = typer.Option(
+        False,
+        help = "Capitalize the imported task names."
+    )
+):
+    """
+    Import many tasks at once, ex. hours tracked elsewhere or an exported month.
+
+    Each row needs a `Date` and a `Task`, and can have `Hours`, a `Deliverable`, 
+    and a `key`. Rows are added to the month of their date. Invalid rows are 
+    skipped and listed after the import, without stopping it. Task names are 
+    kept as they are, like with `clockin`, unless you pass `--titlecase`.
+    """
+    import importer
+
+    if not os.path.isfile(file):
+        console.print("")
+        console.print(f"No file was found at '{file}'.")
+        console.print("")
+        return
+
+    try:
+        with console.status(f"Importing tasks from '{file}'."):
+            result = importer.import_file(file, database_types, titlecase=titlecase)
+    except ValueError as e:  # unsupported file type
+        console.print("")
+        console.print(str(e))
+        console.print("")
+        return
+
+    imported = sum(result.imported.values())
+    console.print("")
+    console.print(
+        f"Imported [{Config.colors['hours']}]{imported}[/{Config.colors['hours']}] "
+        f"[{Config.colors['task']}]tasks[/{Config.colors['task']}]"
+        + (
+            " into " + ", ".join(
+                f"{monthyear} ({count})" for monthyear, count in result.imported.items()
+            ) + "." 
+            if imported else "."
+        )
+    )
+
+    if result.errors:
+        console.print("")
+        console.print(f"{len(result.errors)} rows were skipped:")
+        for line_num, error in result.errors:
+            console.print(f"  Line {line_num}: {error}", markup=False)
+
+    for warning in result.warnings:
+        console.print("")
+        console.print(warning, markup=False)
+
+    console.print("")
+
+
+@app.command(name="daemon")
+def daemon_command(
+    stop: bool = typer.Option(
+        False,
+        help = "Stop the running daemon."
+    ),
+    foreground: bool = typer.Option(
+        False,
+        help = "Serve from this terminal instead of the background."
+    )
+):
+    """
+    Start a background daemon that keeps the CLI loaded, so every command after 
+    it runs in a few milliseconds. Commands are sent to the daemon automatically 
+    while it's running, and run normally when it isn't. 
+
+    The daemon exits by itself when the month changes or config.ini or keys.ini 
+    is edited. Stop it with `--stop`, ex. after updating the CLI.
+    """
+    import daemon
+
+    if stop:
+        stopped = daemon.stop()
+        console.print("")
+        console.print("The daemon was stopped." if stopped else "The daemon isn't running.")
+        console.print("")
+        return
+
+    if daemon.is_running():
+        console.print("")
+        console.print("The daemon is already running.")
+        console.print("")
+        return
+
+    if foreground:
+        console.print(f"Serving commands at '{daemon.SOCKET_PATH}'. Press Ctrl+C to stop.")
+        try:
+            daemon.serve()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    started = daemon.start()
+    console.print("")
+    console.print(
+        "The daemon is running. Commands will be sent to it until it's stopped." 
+        if started else "The daemon couldn't be started. Try `daemon --foreground`."
+    )
+    console.print("")
+
+
+@app.command()
+def shell():
+    """
+    Run commands one after another in an interactive session. The month is fetched
+    once and kept up to date with your changes, so every command after the first 
+    responds instantly. Offers history and tab completion of commands, options, 
+    task names and keys.
+    """
+    import repl
+    repl.run(app, work_log)
+
+
 @app.command()
 def modify(
     task: str = typer.Argument(
@@ -668,7 +1223,11 @@ def modify(
     This command is only meant to be used to correct errors. To update the delivery
     of a task, it is much safer to use the `deliver` command.
     """
-    item = utils.capitalize_title(item)
+    # Match the attribute name locally, ex. 'hours' to 'Hours'
+    item = next(
+        (attribute for attribute in database_types if attribute.lower() == item.lower()),
+        item
+    )
     try: value = float(value)
     except ValueError: pass
 
@@ -700,9 +1259,22 @@ def modify(
             console.print("")
             return
 
-    # Update the database
-    task[item] = value
-    work_log.put(task)
+    # Keys like the active slot are only written by the commands that manage them
+    if item == 'key' and value in storage.reserved_keys:
+        console.print("")
+        console.print(
+            f"'{value}' is a reserved "
+            f"[{Config.colors['key']}]key[/{Config.colors['key']}]."
+        )
+        console.print("")
+        return
+
+    # Update the database, finishing the active task like `clockout` if given hours
+    before = TaskRecord.from_item(task.to_item())
+    task.set(item, value)
+    _put_task(work_log, task)
+    # Setting the key stores a copy under the new key, leaving the original
+    _record_write(work_log, [] if item == 'key' else [before], [task])
 
     # Report back to the user
     console.print("")
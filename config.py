@@ -36,14 +36,49 @@ class Config:
     else:
         center_table = False
 
+    # Tasks per page when paging through the log
+    page_size = int(config['General']['page_size'])
+
     # Database name by month
     db_basename = config['General']['database_name']
     month, year = dt.datetime.now().month, dt.datetime.now().year
     current_db = db_basename + f"_{month}_{year}"
 
+    # Storage backend - deta or sqlite
+    storage_backend = config['Storage']['backend'].lower().strip()
+    if storage_backend not in ('deta', 'sqlite'):
+        raise Exception(
+            f"Unknown storage backend '{storage_backend}'. "
+            "Use either 'deta' or 'sqlite' in config.ini."
+        )
+    storage_workers = int(config['Storage']['max_workers'])
+    sqlite_path = os.path.join(
+        os.path.dirname(config_path), 
+        os.path.expanduser(config['Storage']['sqlite_path'])
+    )
+
+    # Local cache of Deta months
+    cache_enabled = config['Cache']['enabled'].lower() == 'true'
+    cache_dir = os.path.join(
+        os.path.dirname(config_path), 
+        os.path.expanduser(config['Cache']['directory'])
+    )
+    cache_ttl = int(config['Cache']['ttl_seconds'])
+    max_capitalizations = int(config['Cache']['max_capitalizations'])
+    max_short_links = int(config['Cache']['max_short_links'])
+
+    # Shared HTTP sessions - connections kept alive per host
+    http_pool_size = int(config['HTTP']['pool_size'])
+    http_timeout = (
+        float(config['HTTP']['connect_timeout']),
+        float(config['HTTP']['read_timeout'])
+    )
+    http_retries = int(config['HTTP']['retries'])
+
     # Report
     report_font = config['Report']['font']
     report_char_cutoff = int(config['Report']['char_length_cutoff'])
+    bitly_workers = int(config['Report']['bitly_workers'])
 
     # Smart capitalization - RapidAPI
     smart_cap_preference = config['General']['smart_capitalization'].lower()
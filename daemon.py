@@ -0,0 +1,333 @@
+"""
+Opt-in resident daemon. `loghours daemon` starts a background process that keeps
+the CLI imported, with its HTTP connections and cached months in memory, and serves
+commands over a local Unix socket. `main.py` forwards each invocation to it when
+it's running and otherwise runs the command itself.
+
+Only the standard library is imported at the top of this module, since the client
+runs before anything else on every command.
+"""
+# Local imports
+import json
+import os
+import socket
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Unix sockets have a short path limit, so it can be moved with LOGHOURS_SOCKET
+SOCKET_PATH = os.environ.get("LOGHOURS_SOCKET") or os.path.join(REPO_DIR, ".loghours.sock")
+
+# A change to any of these makes the daemon hand commands back and exit
+WATCHED_FILES = ("config.ini", "keys.ini")
+
+# Global options followed by a value, ex. `--profile-output trace.json`
+VALUE_OPTIONS = ("--profile-output",)
+
+
+# ---- Client ----
+
+
+def _connect() -> socket.socket | None:
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(SOCKET_PATH):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:  # left behind by a daemon that didn't exit cleanly
+        sock.close()
+        return None
+
+    return sock
+
+
+def _command_name(argv: list[str]) -> str | None:
+    """The command in `argv`, skipping the global options before it and their values."""
+    args = iter(argv)
+    for arg in args:
+        if arg in VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def _terminal() -> dict:
+    """What rich needs to know to render for the client's terminal."""
+    try:
+        size = os.get_terminal_size(sys.stdout.fileno())
+        columns, lines = size.columns, size.lines
+    except (OSError, ValueError):
+        columns = lines = None
+
+    return {
+        "tty": sys.stdout.isatty(),
+        "columns": columns,
+        "lines": lines,
+        "environ": {
+            name: value for name, value in os.environ.items()
+            if name in ("TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR", "COLUMNS", "LINES")
+        }
+    }
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Runs the command in the daemon, streaming its output here and answering its
+    prompts from stdin. Returns the exit code, or `None` if there's no daemon to
+    run it, in which case the caller should run it in-process.
+    """
+    # The shell runs in-process, where it has the terminal for history and completion
+    if _command_name(argv) in ("daemon", "shell") or (sock := _connect()) is None:
+        return None
+
+    with sock, sock.makefile("rwb") as conn:
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": {
+                name: value for name, value in os.environ.items()
+                if name.startswith("LOGHOURS_")
+            },
+            "terminal": _terminal()
+        }
+        conn.write(json.dumps(request).encode() + b"\n")
+        conn.flush()
+
+        try:
+            for line in conn:
+                message = json.loads(line)
+                if "out" in message:
+                    sys.stdout.write(message["out"])
+                    sys.stdout.flush()
+                elif "err" in message:
+                    sys.stderr.write(message["err"])
+                    sys.stderr.flush()
+                elif "input" in message:
+                    conn.write(json.dumps({"line": sys.stdin.readline()}).encode() + b"\n")
+                    conn.flush()
+                elif "exit" in message:
+                    return message["exit"]
+                elif "fallback" in message:
+                    return None
+        except BrokenPipeError:  # output piped to a command that exited, like `head`
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+
+    return 1  # the daemon went away mid-command
+
+
+def is_running() -> bool:
+    if (sock := _connect()) is None:
+        return False
+
+    sock.close()
+    return True
+
+
+def stop() -> bool:
+    """Asks the daemon to exit once it's done with the current command."""
+    if (sock := _connect()) is None:
+        return False
+
+    with sock, sock.makefile("rwb") as conn:
+        conn.write(json.dumps({"stop": True}).encode() + b"\n")
+        conn.flush()
+        conn.readline()
+
+    return True
+
+
+def start() -> bool:
+    """Starts the daemon in the background, returning whether it came up."""
+    import subprocess
+    import time
+
+    subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "main.py"), "daemon", "--foreground"],
+        cwd = REPO_DIR,
+        stdin = subprocess.DEVNULL,
+        stdout = subprocess.DEVNULL,
+        stderr = subprocess.DEVNULL,
+        start_new_session = True
+    )
+
+    for _ in range(100):
+        if is_running():
+            return True
+        time.sleep(0.05)
+
+    return False
+
+
+# ---- Server ----
+
+
+class _Connection:
+    """One client, speaking newline-delimited JSON. Writes may come from threads."""
+    def __init__(self, sock: socket.socket):
+        import threading
+
+        self._file = sock.makefile("rwb")
+        self._lock = threading.Lock()
+
+    def send(self, **message) -> None:
+        with self._lock:
+            self._file.write(json.dumps(message).encode() + b"\n")
+            self._file.flush()
+
+    def receive(self) -> dict | None:
+        line = self._file.readline()
+        return json.loads(line) if line else None
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _client_streams(connection: _Connection, tty: bool):
+    """Stand-ins for stdin, stdout and stderr that talk to the client."""
+    import io
+
+    class Output(io.TextIOBase):
+        def __init__(self, kind: str):
+            self._kind = kind
+
+        def writable(self) -> bool:
+            return True
+
+        def write(self, text: str | bytes) -> int:
+            if isinstance(text, bytes):  # click writes bytes in some cases
+                text = text.decode(errors="replace")
+            if text:
+                connection.send(**{self._kind: text})
+            return len(text)
+
+        def isatty(self) -> bool:
+            return tty
+
+    class Input(io.TextIOBase):
+        def readable(self) -> bool:
+            return True
+
+        def readline(self, size: int = -1) -> str:
+            connection.send(input=True)
+            return (connection.receive() or {}).get("line", "")
+
+        def isatty(self) -> bool:
+            return tty
+
+    return Input(), Output("out"), Output("err")
+
+
+def _watched_mtimes() -> tuple[float, ...]:
+    return tuple(
+        os.path.getmtime(path) if os.path.exists(path := os.path.join(REPO_DIR, file)) else 0
+        for file in WATCHED_FILES
+    )
+
+
+def _run(command, connection: _Connection, request: dict) -> int:
+    """Runs one command with the client's streams, terminal, directory and environment."""
+    import contextlib
+    import traceback
+    from rich.console import Console
+
+    import display
+    import profiling
+
+    profiling.reset()
+
+    terminal = request["terminal"]
+    stdin, stdout, stderr = _client_streams(connection, terminal["tty"])
+
+    # The shared console renders for the client's terminal for this command only
+    client_console = Console(
+        file = stdout,
+        force_terminal = terminal["tty"],
+        width = terminal["columns"],
+        height = terminal["lines"],
+        _environ = terminal["environ"]
+    )
+    console_state = dict(vars(display.console))
+    vars(display.console).update(vars(client_console))
+
+    cwd = os.getcwd()
+    environ = dict(os.environ)
+    os.environ.update(request["env"])
+
+    try:
+        os.chdir(request["cwd"])
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            original_stdin, sys.stdin = sys.stdin, stdin
+            try:
+                command.main(args=request["argv"], prog_name="loghours")
+            except SystemExit as e:
+                return e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+            except Exception:
+                stderr.write(traceback.format_exc())
+                return 1
+            finally:
+                sys.stdin = original_stdin
+        return 0
+    finally:
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(environ)
+        vars(display.console).clear()
+        vars(display.console).update(console_state)
+        profiling.reset()
+
+
+def serve() -> None:
+    """
+    Serves commands one at a time until stopped. Exits, handing the pending command
+    back to its client, when the month changes or config.ini or keys.ini is edited,
+    so the next command starts a fresh process with the new settings.
+    """
+    import datetime as dt
+    import typer
+
+    import cli
+    from config import Config
+
+    command = typer.main.get_command(cli.app)
+    mtimes = _watched_mtimes()
+
+    if os.path.exists(SOCKET_PATH):
+        os.remove(SOCKET_PATH)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    os.chmod(SOCKET_PATH, 0o600)
+    server.listen()
+
+    try:
+        while True:
+            sock, _ = server.accept()
+            connection = _Connection(sock)
+            try:
+                request = connection.receive()
+                if request is None:  # `is_running` checks
+                    continue
+
+                if request.get("stop"):
+                    connection.send(exit=0)
+                    return
+
+                today = dt.date.today()
+                if (today.month, today.year) != (Config.month, Config.year) or _watched_mtimes() != mtimes:
+                    connection.send(fallback=True)
+                    return
+
+                connection.send(exit=_run(command, connection, request))
+            except OSError:  # the client went away
+                pass
+            finally:
+                connection.close()
+                sock.close()
+    finally:
+        server.close()
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
@@ -3,55 +3,77 @@ from rich.table import Table
 from rich.console import Console; console = Console()
 
 # Local imports
-from datetime import datetime as dt
+from collections.abc import Iterable, Mapping
+import heapq
+import math
 
 # Project modules
 from config import Config 
+from records import TaskRecord
+import profiling
 
 
-def _reorder_dicts(tasks: dict | list[dict]) -> list[dict]:
+def _reorder_dicts(tasks: Mapping | Iterable[Mapping]) -> list[TaskRecord]:
     """
-    `tasks` can be a single dict or list of dicts. But, regardless
-    of whether a dict or list of dicts was passed, a list of dicts is returned.
-    So, if you pass in a single dict, a list is returned containing one dict.
+    `tasks` can be a single task or any iterable of tasks, like a fetch stream, as
+    dicts or records. But, regardless of what was passed, a list of records sorted by
+    date is returned. So, if you pass in a single dict, a list is returned containing 
+    one record. Records already iterate their fields in the configured column order.
     """
-    if isinstance(tasks, dict):
+    if isinstance(tasks, Mapping):
         tasks = [tasks]
     
-    # Sort the list by date
-    dates = [(idx, dt.strptime(task["Date"], Config.dt_format)) for idx, task in enumerate(tasks)]
-    sorted_dates = sorted(dates, key=lambda x: x[1], reverse=Config.reverse_sort)
-    sorted_idx = (tup[0] for tup in sorted_dates)
-
-    # Store the results
-    new_tasks = []
-    for idx in sorted_idx:
-        new_tasks.append(tasks[idx])
-
-    tasks = new_tasks  # overwrite the old tasks
-
-    # Reorder keys in all the dicts
-    return_tasks = []
-    for task in tasks:
-        # Check that it has all the keys
-        if any([True for key in Config.ideal_order if key not in task]):
-            return_tasks.append(task)
-            continue
-
-        return_tasks.append({k: task[k] for k in Config.ideal_order}) 
-
-    return return_tasks
+    # Sort on precomputed keys, consuming the iterable directly
+    return sorted(
+        map(TaskRecord.from_item, tasks), 
+        key = lambda task: task.started,
+        reverse = Config.reverse_sort
+    )
+
+
+def display_month_totals(
+    month_hours: dict[str, float], 
+    payrate: float = None,
+    title: str = "Hours Worked by Month",
+    label: str = "Month"
+) -> None:
+    """
+    Prints a table of the hours worked in each month, ex. `{'7-2022': 12.5}`, with 
+    an overall total. Includes pay if `payrate` is provided. `title` and `label`
+    (the first column) allow other breakdowns, like by task.
+    """
+    table = Table(title=title)
+    table.add_column(label, style=Config.colors['date'])
+    table.add_column("Hours", style=Config.colors['hours'], justify="right")
+    if payrate is not None:
+        table.add_column("Pay", style="green", justify="right")
+
+    rows = [*month_hours.items(), ("Total", sum(month_hours.values()))]
+    for idx, (monthyear, hours) in enumerate(rows):
+        row = [monthyear, f"{hours:,.2f}"]
+        if payrate is not None:
+            row.append(f"${hours * payrate:,.2f}")
+        table.add_row(*row, end_section=idx == len(rows) - 2)  # line above the total
+
+    console.print('')
+    console.print(table, justify="center" if Config.center_table else "default")
 
 
-def display_tasks(tasks: dict | list[dict], space_above: bool = True) -> None:
+@profiling.timed("display")
+def display_tasks(
+    tasks: Mapping | Iterable[Mapping], 
+    space_above: bool = True, 
+    caption: str = None
+) -> None:
     """
     Uses rich to print a table of tasks. If `space_above` is not passed in as 
     `True`, doesn't prints a blank line before printing the table to provide room.
 
     Reads the first task in the list of tasks to determine what month is being displayed.
+    An optional `caption` is printed below the table.
     """
     full_log_title = True
-    if isinstance(tasks, dict):
+    if isinstance(tasks, Mapping):
         tasks = [tasks]
         full_log_title = False
 
@@ -63,13 +85,13 @@ def display_tasks(tasks: dict | list[dict], space_above: bool = True) -> None:
 
     # Construct title with month and year
     if full_log_title:
-        date = dt.strptime(tasks[0]['Date'], Config.dt_format)
+        date = tasks[0].started
         month, year = date.month, date.year
         title = f"Log of Working Hours for {month}-{year}"
     else:
         title = "Single Task View"
     
-    table = Table(title=title)
+    table = Table(title=title, caption=caption)
 
     for key in tasks[0].keys():
         if key.lower() in Config.colors:  # color the columns
@@ -80,13 +102,13 @@ def display_tasks(tasks: dict | list[dict], space_above: bool = True) -> None:
         table.add_column(key, style=color)
     
     for task in tasks:
-        # Add emojis to none objects
-        if not task['Hours']:
-            task['Hours'] = ':clock1:'
-        if not task['Deliverable']:
-            task['Deliverable'] = ':x:'
-
-        str_vals = (str(val) for val in task.values())
+        # Add emojis to none objects, without changing the task
+        str_vals = (
+            ':clock1:' if key == 'Hours' and not val
+            else ':x:' if key == 'Deliverable' and not val
+            else str(val)
+            for key, val in task.items()
+        )
         table.add_row(*str_vals)
     
     # Display the results
@@ -94,3 +116,92 @@ def display_tasks(tasks: dict | list[dict], space_above: bool = True) -> None:
         console.print('')
 
     console.print(table, justify="center" if Config.center_table else "default")
+
+
+def display_hits(hits: list, caption: str = None) -> None:
+    """
+    Prints a table of search hits (`search.Hit`), in the order given, with the
+    month each task is in.
+    """
+    table = Table(title="Search Results", caption=caption)
+    table.add_column("Month", style=Config.colors['date'])
+    for key in hits[0].record.keys():
+        table.add_column(key, style=Config.colors.get(key.lower(), 'white'))
+
+    for hit in hits:
+        table.add_row(
+            hit.monthyear,
+            *(
+                ':clock1:' if key == 'Hours' and not val
+                else ':x:' if key == 'Deliverable' and not val
+                else str(val)
+                for key, val in hit.record.items()
+            )
+        )
+
+    console.print('')
+    console.print(table, justify="center" if Config.center_table else "default")
+
+
+# ---- Paging ----
+
+
+def select_page(tasks: Iterable[Mapping], page: int, limit: int) -> tuple[list[TaskRecord], int]:
+    """
+    Tasks on `page` (counting from 1) of `limit` tasks each, in display order, and
+    the total number of tasks. Consumes the stream once while keeping only the tasks
+    up to the end of the page in memory, so nothing outside the window is laid out.
+    """
+    total = 0
+    def counted():
+        nonlocal total
+        for task in tasks:
+            total += 1
+            yield TaskRecord.from_item(task)
+
+    select = heapq.nlargest if Config.reverse_sort else heapq.nsmallest
+    window = select(page * limit, counted(), key=lambda task: task.started)
+    return window[(page - 1) * limit:], total
+
+
+def _page_caption(page: int, limit: int, total: int) -> str:
+    pages = max(1, math.ceil(total / limit))
+    return f"Page {page} of {pages} ({total} tasks)"
+
+
+def display_page(tasks: Iterable[Mapping], page: int, limit: int) -> None:
+    """Displays a single page of tasks, see `select_page`."""
+    window, total = select_page(tasks, page, limit)
+    if not window:
+        console.print('')
+        console.print(f"There is no page {page}. {_page_caption(1, limit, total)}.")
+        return
+
+    display_tasks(window, caption=_page_caption(page, limit, total))
+
+
+def page_tasks(tasks: Iterable[Mapping], limit: int) -> None:
+    """
+    Interactive pager. Tasks are sorted once and each page is laid out only when
+    it's shown. Enter moves forward, 'b' back, and 'q' quits.
+    """
+    tasks = _reorder_dicts(tasks)
+    pages = max(1, math.ceil(len(tasks) / limit))
+
+    page = 1
+    while True:
+        display_tasks(
+            tasks[(page - 1) * limit:page * limit], 
+            caption = _page_caption(page, limit, len(tasks))
+        )
+
+        response = console.input(
+            "[dim]Enter for the next page, 'b' to go back, 'q' to quit: [/dim]"
+        ).strip().lower()
+
+        if response == 'q' or (response == '' and page == pages):
+            return
+        elif response == 'b':
+            page = max(1, page - 1)
+        elif response == '':
+            page += 1
@@ -1,7 +1,6 @@
-# Non-local imports
-import pandas as pd
-
 # Local imports
+from collections.abc import Iterable, Mapping
+import csv
 import os
 import pathlib
 import zipfile
@@ -10,35 +9,65 @@ import zipfile
 from config import Config
 from pdfclass import PDF
 from display import _reorder_dicts
-from bitly import bitly
+from records import TaskRecord
+from bitly import shorten_links
+import profiling
+
+
+def _clean_tasks(tasks: Iterable[Mapping]) -> list[TaskRecord]:
+    """Converts tasks to records, sorted by date."""
+    return _reorder_dicts(tasks)
+
 
+def _export_row(task: TaskRecord) -> dict:
+    """Task values as exported: without the key, and unfinished tasks as 0 hours."""
+    row = {field: val for field, val in task.items() if field != 'key'}
+    if not row['Hours']:
+        row['Hours'] = 0
+    return row
 
-def export_tasks(tasks: list[dict], monthyear: str, path: str = "") -> str:
+
+def write_csv(tasks: Iterable[TaskRecord], path: str) -> None:
+    """
+    Writes tasks to a CSV row by row, as they're produced. Columns are taken from the
+    first task, preceded by an unnamed index column counting from 0.
     """
-    Takes a list of tasks (dicts) and exports them to a CSV.
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator=os.linesep)
+        columns = None
+        for idx, task in enumerate(map(_export_row, tasks)):
+            if columns is None:
+                columns = list(task.keys())
+                writer.writerow(['', *columns])
+            writer.writerow([idx, *(task.get(column) for column in columns)])
+
+
+def _zip_files(path: str) -> None:
+    """Zips `path`.csv and `path`.pdf together into `path`.zip."""
+    with zipfile.ZipFile(f"{path}.zip", "w") as archive:
+        archive.write(f"{path}.csv")
+        archive.write(f"{path}.pdf")
+
+
+@profiling.timed("export")
+def export_tasks(tasks: Iterable[Mapping], monthyear: str, path: str = "") -> str:
+    """
+    Takes tasks (dicts), as a list or a fetch stream, and exports them to a CSV.
 
     `monthyear` is in the format 7-2022. This is provided by the user when
     invoking the export command from the CLI.
-    
+
     The resulting files are stored in the current working directory of the terminal.
     So, the user should be instructed to navigate to the output directory of choice
     using cd in their shell, and then execute the command using the CLI.
 
-    Output files are automatically zipped together into a .zip archive called 
+    Output files are automatically zipped together into a .zip archive called
     "Work Log 7-2022.zip" if the month is July, 2022. This is a single file
     that can be forwarded to anyone. When unzipped, it contains all export files,
     including the PDF report and CSV full list of all logged tasks.
     """
-    # Remove key and convert everything to string and shorten long values
-    tasks = _reorder_dicts(tasks)
+    tasks = _clean_tasks(tasks)
 
-    for task in tasks:
-        del task['key']
-
-        # Mark all unfinished tasks as 0 hours
-        if not task['Hours']:
-            task['Hours'] = 0
-    
     base_name = f"Work Log {monthyear}"
 
     path = path or os.getcwd()
@@ -49,114 +78,214 @@ def export_tasks(tasks: list[dict], monthyear: str, path: str = "") -> str:
     path = os.path.join(path, base_name)
 
     # Store CSV before changing values
-    pd.DataFrame(tasks).to_csv(f"{path}.csv")
+    write_csv(tasks, f"{path}.csv")
 
     # Make PDF
     create_pdf(tasks, monthyear, f"{path}.pdf")
 
     # Zip resulting files
-    with zipfile.ZipFile(f"{path}.zip", "w") as archive:
-        archive.write(f"{path}.csv")
-        archive.write(f"{path}.pdf")
+    _zip_files(path)
 
     return path
 
 
-def create_pdf(tasks: list[dict], monthyear: str, path: str):
+@profiling.timed("export")
+def export_range(month_tasks: dict[str, Iterable[Mapping]], path: str = "") -> str:
     """
-    Generate a full PDF report, shortening links with Bitly, 
-    and including an appendix.
+    Exports several months, ex. a quarter or a year, as one packet. `month_tasks`
+    maps each month, ex. '7-2022', to its tasks, in order.
+
+    Produces a single PDF with a section and subtotal per month and one appendix
+    of deliverables shared by all months, plus one combined CSV, zipped together
+    as "Work Log 1-2022 to 12-2022.zip".
     """
-    data = [list(tasks[0].keys())]
-    appendix_count = 0
-    appendix = {}
-    hours_total = 0
+    month_tasks = {monthyear: _clean_tasks(tasks) for monthyear, tasks in month_tasks.items()}
+    months = list(month_tasks)
+
+    base_name = f"Work Log {months[0]} to {months[-1]}"
+    path = os.path.join(path or os.getcwd(), base_name)
+
+    # Store CSV before changing values
+    write_csv((task for tasks in month_tasks.values() for task in tasks), f"{path}.csv")
+
+    create_range_pdf(month_tasks, f"{path}.pdf")
+
+    _zip_files(path)
+
+    return path
+
+
+def _table_rows(tasks: list[TaskRecord], appendix: dict[str, int]) -> tuple[list[list[str]], float]:
+    """
+    Stringifies tasks into table rows, cutting long values short and referencing them
+    in `appendix` (full value to appendix number), which is updated in place. Values
+    already in the appendix reuse their number. Returns the rows and total hours.
+    """
+    data = [list(_export_row(tasks[0]).keys())] if tasks else []
+    hours_total = sum(task.seconds or 0 for task in tasks) / 3600
     for task in tasks:
-        # Stringify and shorten length items
-        for key, val in task.items():
-            if key == 'Hours':
-                hours_total += val
+        row = []
+        for val in _export_row(task).values():
             str_val = str(val)
             if len(str_val) > Config.report_char_cutoff:
-                appendix_count += 1
-                appendix[appendix_count] = str_val
-                str_val = f"A{appendix_count}: " + str_val[:Config.report_char_cutoff] + '...'
-            task[key] = str_val
+                appendix_idx = appendix.setdefault(str_val, len(appendix) + 1)
+                str_val = f"A{appendix_idx}: " + str_val[:Config.report_char_cutoff] + '...'
+            row.append(str_val)
+
+        data.append(row)
 
-        data.append(list(task.values()))
+    return data, hours_total
 
 
+def _new_report(title: str, intro: str) -> PDF:
+    """Letter-sized PDF with the report title and introduction."""
     pdf = PDF(format='letter')
     pdf.add_page()
     pdf.set_font(Config.report_font, size=16)
 
     # Titles
-    pdf.cell(200, 10, txt=f"Log of Working Hours {monthyear}", align='C')
+    pdf.cell(200, 10, txt=title, align='C')
     pdf.ln()
     pdf.ln()
 
     # Body
     pdf.set_font("Times", size=11)
 
+    pdf.cell(txt=intro)
+    pdf.ln()
+
     pdf.cell(
-        txt = (
-            "The following is an automatically generated report of all hours logged "
-            f"in the month of {monthyear}. "
-        )
+        txt = "Any items cut off for lack of space can be seen in full in the appendix."
     )
     pdf.ln()
 
+    pdf.ln()
+    return pdf
+
+
+def _write_appendix(pdf: PDF, appendix: dict[str, int]) -> None:
+    """Writes the deliverables appendix, shortening every link at once."""
+    if not appendix:
+        return
+
+    pdf.set_font(Config.report_font, size = 14)
     pdf.cell(
-        txt = "Any items cut off for lack of space can be seen in full in the appendix."
+        txt = "Appendix of Deliverables",
+        align = 'L'
     )
     pdf.ln()
+    pdf.ln()
+
+    pdf.set_font(Config.report_font, size = 10)
 
+    pdf.cell(txt="Some of the following items have been interpreted as links.")
+    pdf.cell(txt="They've been shortened below using bit.ly.")
     pdf.ln()
-    pdf.create_table(
-        table_data = data, 
+    pdf.ln()
+    pdf.ln()
+
+    pdf.set_font(Config.report_font, size = 11)
+
+    # Shorten every link up front, concurrently
+    short_links = shorten_links(
+        [deliverable for deliverable in appendix if 'http' in deliverable]
+    )
+
+    # Links
+    for deliverable, idx in appendix.items():
+        pdf.cell(txt=f"Item A{idx}")
+
+        if 'http' in deliverable:
+            pdf.ln()
+            pdf.cell(txt=short_links[deliverable])
+        else:
+            if len(deliverable) < 100:
+                pdf.ln()
+                pdf.cell(txt=deliverable)
+            else:
+                pdf.set_font(Config.report_font, size = 9)
+                pdf.cell(txt="(The full deliverable is too long to be displayed. Part of it is shown below.)")
+                pdf.set_font(Config.report_font, size = 11)
+                pdf.ln()
+                pdf.cell(txt=deliverable[:100]+'...')
+
+        pdf.ln()
+        pdf.ln()
+
+
+@profiling.timed("pdf")
+def create_pdf(tasks: list[TaskRecord], monthyear: str, path: str):
+    """
+    Generate a full PDF report, shortening links with Bitly,
+    and including an appendix.
+    """
+    appendix = {}
+    data, hours_total = _table_rows(tasks, appendix)
+
+    pdf = _new_report(
+        title = f"Log of Working Hours {monthyear}",
+        intro = (
+            "The following is an automatically generated report of all hours logged "
+            f"in the month of {monthyear}. "
+        )
+    )
+
+    pdf.render_table(
+        table_data = data,
         title = f"Total Hours Logged: {hours_total:,.2f}",
         cell_width = [30, 50, 15, 93]
     )
     pdf.ln()
 
     # Deliverables appendix
-    if appendix:
-        pdf.set_font(Config.report_font, size = 14)
-        pdf.cell(
-            txt = "Appendix of Deliverables",
-            align = 'L' 
+    _write_appendix(pdf, appendix)
+
+    pdf.output(path)
+
+
+@profiling.timed("pdf")
+def create_range_pdf(month_tasks: dict[str, list[TaskRecord]], path: str):
+    """
+    Generate one PDF report for several months, with a section and subtotal per
+    month, an overall total, and a single deduplicated appendix.
+    """
+    months = list(month_tasks)
+    appendix = {}
+    sections = {
+        monthyear: _table_rows(tasks, appendix) for monthyear, tasks in month_tasks.items()
+    }
+    hours_total = sum(hours for _, hours in sections.values())
+
+    pdf = _new_report(
+        title = f"Log of Working Hours {months[0]} to {months[-1]}",
+        intro = (
+            "The following is an automatically generated report of all hours logged "
+            f"from {months[0]} to {months[-1]}. "
         )
-        pdf.ln()
-        pdf.ln()
+    )
+
+    pdf.set_font(Config.report_font, size = 12)
+    pdf.cell(txt=f"Total Hours Logged: {hours_total:,.2f}")
+    pdf.ln()
+    pdf.ln()
 
-        pdf.set_font(Config.report_font, size = 10)
+    for monthyear, (data, hours) in sections.items():
+        if not data:
+            continue
 
-        pdf.cell(txt="Some of the following items have been interpreted as links.")
-        pdf.cell(txt="They've been shortened below using bit.ly.")
-        pdf.ln()
-        pdf.ln()
+        pdf.set_font(Config.report_font, size = 14)
+        pdf.cell(txt=f"Work Log {monthyear}")
         pdf.ln()
 
         pdf.set_font(Config.report_font, size = 11)
-        # Links
-        for idx, deliverable in appendix.items():
-            pdf.cell(txt=f"Item A{idx}")
-
-            if 'http' in deliverable:
-                pdf.ln()
-                pdf.cell(txt=bitly(deliverable))
-            else:
-                if len(deliverable) < 100:
-                    pdf.ln()
-                    pdf.cell(txt=deliverable)
-                else:
-                    pdf.set_font(Config.report_font, size = 9)
-                    pdf.cell(txt="(The full deliverable is too long to be displayed. Part of it is shown below.)")
-                    pdf.set_font(Config.report_font, size = 11)
-                    pdf.ln()
-                    pdf.cell(txt=deliverable[:100]+'...')
+        pdf.render_table(
+            table_data = data,
+            title = f"Hours Logged: {hours:,.2f}",
+            cell_width = [30, 50, 15, 93]
+        )
+        pdf.ln()
 
-            pdf.ln()
-            pdf.ln()
+    # Deliverables appendix, shared by every month
+    _write_appendix(pdf, appendix)
 
     pdf.output(path)
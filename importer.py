@@ -0,0 +1,209 @@
+"""
+Bulk import of tasks from a CSV, in the format written by `export`, or a JSONL file
+with one task object per line. Rows are validated, task names are capitalized in a
+single batch, and each month's rows are written together with batched puts.
+"""
+# Local imports
+from collections.abc import Iterator
+import csv
+import dataclasses
+import json
+import os
+
+# Project modules
+from records import TaskRecord
+import search
+import storage
+import summary
+import timestamps
+import utils
+import profiling
+
+
+@dataclasses.dataclass
+class ImportResult:
+    """
+    Tasks imported per month, ex. `{'7-2022': 12}`, errors by line number, and
+    problems that didn't stop rows being stored, like a summary left out of date.
+    """
+    imported: dict[str, int] = dataclasses.field(default_factory=dict)
+    errors: list[tuple[int, str]] = dataclasses.field(default_factory=list)
+    warnings: list[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class MonthWrite:
+    """What happened writing a month's items, with failures by position in the items."""
+    stored: int = 0
+    failed: dict[int, str] = dataclasses.field(default_factory=dict)
+    warnings: list[str] = dataclasses.field(default_factory=list)
+
+
+def read_rows(path: str) -> Iterator[tuple[int, dict | str]]:
+    """
+    Yields each row of the file with its line number. CSV rows are dicts, and JSONL
+    lines are yielded as text, to be decoded by `validate_row`, so a malformed line
+    is only an error for that row.
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    with open(path, newline='', encoding='utf-8') as file:
+        if extension == '.csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        elif extension in ('.jsonl', '.ndjson'):
+            for line_num, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_num, line
+        else:
+            raise ValueError(f"Can't import '{extension}' files. Use a .csv or .jsonl file.")
+
+
+def validate_row(row: dict | str, types: dict[str, type]) -> dict:
+    """
+    Converts a row to a task item with the field `types`, ex. `cli.database_types`.
+    Blank values become `None`, except `Hours`, which is required. Raises `ValueError`
+    describing the first problem.
+    """
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("Each line must be a JSON object.")
+
+    # Skip the unnamed index column written by `export`
+    row = {field: val for field, val in row.items() if field}
+
+    if unknown := [field for field in row if field not in types]:
+        raise ValueError(f"Unknown fields: {', '.join(map(str, unknown))}.")
+
+    item = {}
+    for field, kind in types.items():
+        val = row.get(field)
+        if isinstance(val, str):
+            val = val.strip()
+
+        if val is None or val == '':
+            item[field] = None
+            continue
+
+        try:
+            item[field] = kind(val)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a {kind.__name__}, not '{val}'.")
+
+    if not item['Task']:
+        raise ValueError("Task is missing.")
+    if not item['Date']:
+        raise ValueError("Date is missing.")
+
+    try:
+        timestamps.parse(item['Date'])
+    except ValueError:
+        raise ValueError(f"Date '{item['Date']}' isn't in the configured format.")
+
+    # Unfinished tasks belong in the active slot, which only `clockin` fills
+    if item['Hours'] is None:
+        raise ValueError("Hours is missing. Unfinished tasks can't be imported.")
+    if item['Hours'] < 0:
+        raise ValueError("Hours can't be negative.")
+
+    # Keys are only kept if given, otherwise they're generated when stored
+    if item['key'] is None:
+        del item['key']
+    elif item['key'] in storage.reserved_keys:
+        raise ValueError(f"Key '{item['key']}' is reserved.")
+
+    return item
+
+
+def _write_month(name: str, items: list[dict]) -> MonthWrite:
+    """
+    Writes a month's items and adds those stored to its summary and search index.
+    Items with keys may have replaced tasks, whose hours are unknown without a
+    fetch, so the summary is rebuilt instead, as it is if adding to it fails.
+    """
+    result = MonthWrite()
+    try:
+        db = storage.base(name)
+        stored = db.put_many(items)
+    except storage.PutManyError as e:
+        stored = e.stored
+        result.failed = dict.fromkeys(e.failed, f"Couldn't be written: {e}")
+    except Exception as e:
+        result.failed = dict.fromkeys(range(len(items)), f"Couldn't be written: {e}")
+        return result
+
+    result.stored = len(stored)
+    records = [TaskRecord.from_item(item) for item in stored]
+    month, year = storage.month_of(name)
+
+    try:
+        if any('key' in item for item in items):
+            summary.rebuild(db)
+        else:
+            try:
+                summary.record(db, added=records)
+            except Exception:
+                summary.rebuild(db)
+    except Exception as e:
+        result.warnings.append(
+            f"The summary of {month}-{year} couldn't be updated ({e}). "
+            f"Run `reconcile {month}-{year}`."
+        )
+
+    try:
+        search.record(name, added=records)
+    except Exception as e:
+        result.warnings.append(
+            f"The search index of {month}-{year} couldn't be updated ({e}). "
+            "The next search with `--refresh` rebuilds it."
+        )
+
+    return result
+
+
+@profiling.timed("import")
+def import_file(path: str, types: dict[str, type], titlecase: bool = False) -> ImportResult:
+    """
+    Imports every valid row of the file at `path`. Invalid rows are skipped and
+    reported in the result, as is every row of a month that couldn't be written.
+    """
+    result = ImportResult()
+
+    rows = []
+    for line_num, row in read_rows(path):
+        try:
+            rows.append((line_num, validate_row(row, types)))
+        except ValueError as e:
+            result.errors.append((line_num, str(e)))
+
+    if titlecase:
+        titles = utils.capitalize_titles([item['Task'] for _, item in rows])
+        for (_, item), title in zip(rows, titles):
+            item['Task'] = title
+
+    # Route each row to the Base of its month
+    months: dict[str, list[tuple[int, dict]]] = {}
+    monthyears: dict[str, str] = {}
+    for line_num, item in rows:
+        started = timestamps.parse(item['Date'])
+        name = storage.month_name(started.month, started.year)
+        monthyears[name] = f"{started.month}-{started.year}"
+        months.setdefault(name, []).append((line_num, item))
+
+    written = storage.map_months(
+        lambda name: _write_month(name, [item for _, item in months[name]]),
+        list(months)
+    )
+
+    for name, month_write in written.items():
+        if month_write.stored:
+            result.imported[monthyears[name]] = month_write.stored
+        result.errors.extend(
+            (months[name][idx][0], error) for idx, error in month_write.failed.items()
+        )
+        result.warnings.extend(month_write.warnings)
+
+    result.errors.sort()
+    return result
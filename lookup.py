@@ -0,0 +1,137 @@
+"""
+Resolve task names against a month of items fetched once, instead of querying
+the database for every fallback.
+"""
+# Local imports
+from collections import defaultdict
+import re
+
+
+# A fuzzy match is used on its own if it's at least this similar to the query...
+min_similarity: float = 0.6
+
+# ...and this much more similar than the next closest name
+min_margin: float = 0.08
+
+# Names less similar than this aren't suggested at all
+min_candidate_similarity: float = 0.3
+
+
+def trigrams(name: str) -> set[str]:
+    """
+    Every three character sequence of the case-folded name, padded so the start
+    and end of the name count for more, ex. '  a', ' ab', 'abc', 'bc '.
+    """
+    padded = f"  {' '.join(name.casefold().split())} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TaskIndex:
+    """
+    Indexes a month's items by exact and case-folded task name. Case-folded matching
+    covers the title-cased form of a query without calling the capitalization API.
+    """
+    def __init__(self, items: list[dict]):
+        self.items = items
+        self._exact: dict[str, list[dict]] = defaultdict(list)
+        self._folded: dict[str, list[dict]] = defaultdict(list)
+
+        for item in items:
+            name = item.get('Task')
+            if not isinstance(name, str):
+                continue
+            self._exact[name].append(item)
+            self._folded[name.casefold()].append(item)
+
+        # Built by `similar` on first use
+        self._trigrams: dict[str, list[str]] | None = None
+        self._trigram_counts: dict[str, int] = {}
+
+    def find(self, task: str) -> list[dict]:
+        """Items named exactly `task`, or if there are none, named `task` in any case."""
+        if matches := self._exact.get(task):
+            return matches
+        return self._folded.get(task.casefold(), [])
+
+    def similar(self, task: str, limit: int = 5) -> list[tuple[str, float]]:
+        """
+        Task names most similar to `task`, best first, with their similarity from 0
+        to 1: the Dice coefficient of their trigrams. Catches typos and partial
+        names. The trigram index is built on first use, with one spelling of each
+        name ignoring case.
+        """
+        if self._trigrams is None:
+            self._trigrams = defaultdict(list)
+            self._trigram_counts = {}
+            for name in self._exact:
+                if name.casefold() in self._trigram_counts:
+                    continue  # spelled differently, but the same trigrams
+                name_trigrams = trigrams(name)
+                self._trigram_counts[name.casefold()] = len(name_trigrams)
+                for trigram in name_trigrams:
+                    self._trigrams[trigram].append(name)
+
+        query = trigrams(task)
+        shared: dict[str, int] = defaultdict(int)
+        for trigram in query:
+            for name in self._trigrams.get(trigram, ()):
+                shared[name] += 1
+
+        scores = {
+            name: 2 * count / (len(query) + self._trigram_counts[name.casefold()])
+            for name, count in shared.items()
+        }
+        ranked = sorted(scores.items(), key=lambda name_score: name_score[1], reverse=True)
+        return [
+            (name, score) for name, score in ranked[:limit]
+            if score >= min_candidate_similarity
+        ]
+
+    def unfinished(self) -> list[dict]:
+        """Items that haven't been clocked out of."""
+        return [item for item in self.items if item.get('Hours') is None]
+
+
+def numbers(name: str) -> list[str]:
+    """The numbers in a name, ex. `['3']` for 'Molly Gray: Session 3'."""
+    return re.findall(r"\d+", name)
+
+
+def best_match(similar: list[tuple[str, float]], task: str) -> str | None:
+    """
+    The name to use from the ranked output of `TaskIndex.similar` for the query
+    `task`, if one is close enough and clearly closer than the rest. Names with
+    different numbers, ex. another session, are never taken for the query.
+    """
+    similar = [(name, score) for name, score in similar if numbers(name) == numbers(task)]
+    if not similar or similar[0][1] < min_similarity:
+        return None
+    if len(similar) > 1 and similar[0][1] - similar[1][1] < min_margin:
+        return None
+
+    return similar[0][0]
+
+
+def prioritize(
+    items: list[dict],
+    prioritize_undelivered: bool = False,
+    prioritize_delivered: bool = False
+) -> dict | None:
+    """
+    Picks a single item out of several with the same name, if exactly one of them
+    is undelivered (or delivered). Returns `None` if there's no single candidate.
+    """
+    if len(items) == 1:
+        return items[0]
+
+    if prioritize_undelivered:
+        undelivered = [item for item in items if item.get('Deliverable') is None]
+        if len(undelivered) == 1:
+            return undelivered[0]
+
+    if prioritize_delivered:
+        delivered = [item for item in items if item.get('Deliverable')]
+        if len(delivered) == 1:
+            return delivered[0]
+
+    return None
@@ -1,7 +1,31 @@
 """
 Run the CLI.
 """
+import sys
+
+import daemon
+
+# Hand the command to the resident daemon, if one is running
+if __name__ == '__main__' and (exit_code := daemon.forward(sys.argv[1:])) is not None:
+    sys.exit(exit_code)
+
+import time
+
+import profiling
+
+
+def _rich_excepthook(*exc_info) -> None:
+    """Installs the Rich traceback on the first uncaught error, not on every startup."""
+    from rich import traceback
+    traceback.install()
+    sys.excepthook(*exc_info)
+
+
+sys.excepthook = _rich_excepthook
+
+_import_start = time.perf_counter()
 import cli
+profiling.record_phase("imports", time.perf_counter() - _import_start, _import_start)
 
 
 if __name__ == '__main__':
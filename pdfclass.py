@@ -1,6 +1,165 @@
 from fpdf import FPDF
 
 class PDF(FPDF):
+    def string_width(self, text):
+        """
+        Width of `text` in the current font, measured once per distinct string and
+        font. Layout measures the same words (names, dates, hours) over and over.
+        """
+        cache_key = (self.font_family, self.font_style, self.font_size_pt, text)
+        cache = self.__dict__.setdefault('_string_widths', {})
+        if cache_key not in cache:
+            cache[cache_key] = self.get_string_width(text)
+        return cache[cache_key]
+
+    def wrap_text(self, text, width):
+        """
+        Splits `text` into lines no wider than `width`, breaking on spaces, and
+        within words that are too long on their own (like links).
+        """
+        space = self.string_width(' ')
+        lines = []
+        line, line_width = '', 0
+        for word in text.split(' '):
+            word_width = self.string_width(word)
+
+            # Break words that can't fit on any line, character by character
+            while word_width > width:
+                if line:
+                    lines.append(line)
+                    line, line_width = '', 0
+                cut, cut_width = 0, 0
+                while cut < len(word) - 1 and cut_width + self.string_width(word[cut]) <= width:
+                    cut_width += self.string_width(word[cut])
+                    cut += 1
+                cut = max(cut, 1)
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = self.string_width(word)
+
+            if line and line_width + space + word_width > width:
+                lines.append(line)
+                line, line_width = word, word_width
+            elif line:
+                line += ' ' + word
+                line_width += space + word_width
+            else:
+                line, line_width = word, word_width
+
+        lines.append(line)
+        return lines
+
+    def render_table(self, table_data, title='', data_size=10, title_size=12, align_data='L', align_header='L', cell_width='even', x_start='x_default'):
+        """
+        Faster replacement for `create_table` that also handles long tables.
+
+        Lays out every row in one pass (wrapping text with cached string widths),
+        then writes each line of text directly instead of one multi_cell per datum.
+        Rows that don't fit on the page start a new page, and the header is repeated
+        at the top of each page.
+
+        table_data:
+                    list of lists with first element being list of headers
+        title:
+                    (Optional) title of table
+        data_size:
+                    the font size of table data
+        title_size:
+                    the font size fo the title of the table
+        align_data, align_header:
+                    L = left align, C = center align, R = right align
+        cell_width:
+                    even: evenly distribute cell/column width
+                    uneven: base cell size on length of cell/column items
+                    int: int value for width of each cell/column
+                    list of ints: width of each cell / column
+        x_start:
+                    where the left edge of table should start, or 'C' to center it
+        """
+        header = [str(datum) for datum in table_data[0]]
+        data = table_data[1:]
+        column_count = len(header)
+        padding = 1  # horizontal, either side of the text
+
+        self.set_font(size=data_size)
+        line_height = self.font_size
+        row_padding = self.font_size * 1.5  # matches create_table's single-line rows
+
+        # Column widths
+        if cell_width == 'even':
+            col_widths = [self.epw / column_count - 1] * column_count
+        elif cell_width == 'uneven':
+            col_widths = [self.string_width(datum) + 4 for datum in header]
+            for row in data:
+                for col, datum in enumerate(row):
+                    col_widths[col] = max(col_widths[col], self.string_width(str(datum)) + 4)
+        elif isinstance(cell_width, list):
+            col_widths = [float(width) for width in cell_width]
+        else:
+            col_widths = [float(cell_width)] * column_count
+
+        table_width = sum(col_widths)
+        if x_start == 'C':
+            x_left = (self.w - table_width) / 2
+        elif isinstance(x_start, (int, float)):
+            x_left = x_start
+        else:
+            x_left = self.l_margin
+
+        col_lefts = []
+        for width in col_widths:
+            col_lefts.append(x_left + sum(col_widths[:len(col_lefts)]))
+
+        # Layout pass: wrapped lines and height of every row
+        def layout(row):
+            cells = [
+                self.wrap_text(str(datum), col_widths[col] - 2 * padding)
+                for col, datum in enumerate(row)
+            ]
+            return cells, max(len(lines) for lines in cells) * line_height + row_padding
+
+        header_layout = layout(header)
+        rows = [layout(row) for row in data]
+
+        def write_row(cells, height, align):
+            top = self.y
+            for col, lines in enumerate(cells):
+                for idx, line in enumerate(lines):
+                    if align == 'R':
+                        x = col_lefts[col] + col_widths[col] - padding - self.string_width(line)
+                    elif align == 'C':
+                        x = col_lefts[col] + (col_widths[col] - self.string_width(line)) / 2
+                    else:
+                        x = col_lefts[col] + padding
+                    # Baseline of each line, with the row's padding split above and below
+                    baseline = top + row_padding / 2 + (idx + 0.8) * line_height
+                    self.text(x, baseline, line)
+            self.y = top + height
+
+        def write_header():
+            self.line(x_left, self.y, x_left + table_width, self.y)
+            write_row(*header_layout, align_header)
+            self.line(x_left, self.y, x_left + table_width, self.y)
+
+        # Title
+        if title != '':
+            self.set_font(size=title_size)
+            self.x = x_left
+            self.cell(txt=title)
+            self.ln(self.font_size * 2.5)
+            self.set_font(size=data_size)
+
+        write_header()
+        for cells, height in rows:
+            if self.y + height > self.page_break_trigger:
+                self.line(x_left, self.y, x_left + table_width, self.y)
+                self.add_page()
+                write_header()
+            write_row(cells, height, align_data)
+
+        self.line(x_left, self.y, x_left + table_width, self.y)
+        self.x = self.l_margin
+
     def create_table(self, table_data, title='', data_size = 10, title_size=12, align_data='L', align_header='L', cell_width='even', x_start='x_default',emphasize_data=[], emphasize_style=None,emphasize_color=(0,0,0)): 
         """
         table_data: 
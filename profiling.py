@@ -0,0 +1,215 @@
+"""
+Opt-in instrumentation, enabled with `--profile` or the `LOGHOURS_PROFILE`
+environment variable. Records wall time per phase, HTTP requests and bytes per
+service, and peak memory, then prints a summary or writes a JSON trace.
+
+Hooks are cheap no-ops while profiling is disabled.
+"""
+# Local imports
+from collections.abc import Callable
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+
+enabled: bool = False
+
+# Phase name to [calls, seconds]. Nested phases are counted in their parents too,
+# and phases run on worker threads add up their time across threads.
+phases: dict[str, list] = {}
+
+# Service name to [requests, bytes sent, bytes received]
+http_requests: dict[str, list] = {}
+
+# Individual phases in the Chrome trace event format, see `write_trace`
+events: list[dict] = []
+
+_lock = threading.Lock()
+_started: float = time.perf_counter()
+_trace_path: str | None = None
+
+
+def start(trace_path: str = None) -> None:
+    """
+    Enables profiling for the rest of the process. Memory is traced from here on,
+    which slows commands down noticeably. With `trace_path`, a JSON trace is written
+    instead of printing a summary.
+    """
+    global enabled, _trace_path
+    import tracemalloc
+
+    enabled = True
+    _trace_path = trace_path
+    tracemalloc.start()
+
+
+def reset() -> None:
+    """Disables profiling and clears what was recorded, ex. between daemon commands."""
+    global enabled, _trace_path, _started
+    import tracemalloc
+
+    enabled, _trace_path, _started = False, None, time.perf_counter()
+    phases.clear()
+    http_requests.clear()
+    events.clear()
+    tracemalloc.stop()
+
+
+def record_phase(name: str, seconds: float, began: float = None) -> None:
+    """Adds a finished phase, ex. imports timed before profiling could be enabled."""
+    if began is None:
+        began = time.perf_counter() - seconds
+
+    with _lock:
+        calls_seconds = phases.setdefault(name, [0, 0.0])
+        calls_seconds[0] += 1
+        calls_seconds[1] += seconds
+        events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": round((began - _started) * 1e6),
+                "dur": round(seconds * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident()
+            }
+        )
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Times the block as `name` if profiling is enabled."""
+    if not enabled:
+        yield
+        return
+
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - began, began)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of the function as phase `name`."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def count_request(service: str, sent: int = 0, received: int = 0) -> None:
+    """Counts an HTTP request to `service` with the bytes sent and received."""
+    if not enabled:
+        return
+
+    with _lock:
+        counts = http_requests.setdefault(service, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += sent
+        counts[2] += received
+
+
+def payload_size(payload) -> int:
+    """
+    Approximate size of a JSON payload, for clients like the Deta SDK that don't
+    expose the raw request. Zero, and free, when profiling is disabled.
+    """
+    if not enabled or payload is None:
+        return 0
+
+    return len(json.dumps(payload, default=str).encode())
+
+
+def summary() -> dict:
+    """Everything recorded so far, as plain data."""
+    import tracemalloc
+
+    return {
+        "total_seconds": time.perf_counter() - _started,
+        "phases": {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in phases.items()
+        },
+        "requests": {
+            service: {"requests": count, "bytes_sent": sent, "bytes_received": received}
+            for service, (count, sent, received) in http_requests.items()
+        },
+        "peak_memory_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    }
+
+
+def write_trace(path: str) -> None:
+    """
+    Writes the summary along with every phase as a trace event, so the file can be
+    opened in chrome://tracing or Perfetto.
+    """
+    with open(path, "w") as file:
+        json.dump({**summary(), "traceEvents": events}, file, indent=2)
+
+
+def print_summary() -> None:
+    from rich.table import Table
+    from display import console
+    from config import Config
+
+    data = summary()
+    total = data["total_seconds"]
+
+    # Nested phases, like bitly within export, are included in their parents
+    table = Table(title="Profile")
+    table.add_column("Phase", style=Config.colors['task'])
+    table.add_column("Calls", justify="right")
+    table.add_column("Seconds", style=Config.colors['hours'], justify="right")
+    table.add_column("Share", justify="right")
+    for name, stats in data["phases"].items():
+        table.add_row(
+            name,
+            str(stats["calls"]),
+            f"{stats['seconds']:.3f}",
+            f"{stats['seconds'] / total:.0%}"
+        )
+    table.add_row("total", "", f"{total:.3f}", "100%", style="bold")
+
+    console.print("")
+    console.print(table)
+
+    if data["requests"]:
+        http = Table(title="HTTP Requests")
+        http.add_column("Service", style=Config.colors['task'])
+        http.add_column("Requests", justify="right")
+        http.add_column("Sent", justify="right")
+        http.add_column("Received", justify="right")
+        for service, stats in data["requests"].items():
+            http.add_row(
+                service,
+                str(stats["requests"]),
+                f"{stats['bytes_sent']:,} B",
+                f"{stats['bytes_received']:,} B"
+            )
+        console.print(http)
+
+    if data["peak_memory_bytes"] is not None:
+        console.print(f"Peak memory: {data['peak_memory_bytes'] / 2**20:,.1f} MiB")
+    console.print("")
+
+
+def report() -> None:
+    """Prints the summary, or writes the trace if a path was given."""
+    if not enabled:
+        return
+
+    if _trace_path:
+        write_trace(_trace_path)
+    else:
+        print_summary()
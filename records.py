@@ -0,0 +1,133 @@
+"""
+Typed task records. Items are converted to `TaskRecord`s once, as they come out of
+storage, and back to plain dicts only to be written.
+"""
+# Local imports
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+
+# Project modules
+from config import Config
+import timestamps
+
+
+# Fields of a task item in the database, in their default order
+fields: tuple[str] = ('Date', 'Task', 'Hours', 'Deliverable', 'key')
+
+# Column order set in config.ini, followed by any fields it leaves out
+_order: tuple[str] = (
+    *(field for field in Config.ideal_order if field in fields),
+    *(field for field in fields if field not in Config.ideal_order)
+)
+
+
+def _hours_to_seconds(hours: float | None) -> int | None:
+    """
+    Hours are usually logged to two decimals, i.e. in steps of 36 seconds, so
+    sums of whole seconds don't accumulate float error.
+    """
+    if hours is None:
+        return None
+    return round(float(hours) * 3600)
+
+
+class TaskRecord(Mapping):
+    """
+    A logged task. Compact (`__slots__`) and read-only as a mapping: reading
+    `record['Hours']` works like it does on an item dict, but changes can only be
+    made explicitly, through attributes or `set`, and written back with `to_item`.
+    Display and export can therefore never alter data that's later put.
+
+    `hours` is kept exactly as stored and written back unchanged. `seconds` is
+    derived from it, for sums and sorting.
+    """
+    __slots__ = ('date', 'task', 'hours', 'deliverable', 'key', 'extra')
+
+    def __init__(
+        self,
+        date: str,
+        task: str,
+        hours: float | None = None,
+        deliverable: str | None = None,
+        key: str | None = None,
+        extra: dict | None = None
+    ):
+        self.date = date
+        self.task = task
+        self.hours = hours
+        self.deliverable = deliverable
+        self.key = key
+        self.extra = extra
+
+    @classmethod
+    def from_item(cls, item: Mapping) -> "TaskRecord":
+        """Converts an item from storage."""
+        if isinstance(item, TaskRecord):
+            return item
+
+        extra = {field: val for field, val in item.items() if field not in fields}
+        return cls(
+            date = item['Date'],
+            task = item['Task'],
+            hours = item.get('Hours'),
+            deliverable = item.get('Deliverable'),
+            key = item.get('key'),
+            extra = extra or None
+        )
+
+    def to_item(self) -> dict:
+        """Plain dict to write to storage."""
+        item = {field: self[field] for field in fields}
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+    @property
+    def seconds(self) -> int | None:
+        return _hours_to_seconds(self.hours)
+
+    @property
+    def started(self) -> datetime:
+        """Parsed `Date`, memoized by the timestamp codec."""
+        return timestamps.parse(self.date)
+
+    def set(self, field: str, value) -> None:
+        """Sets a field by its database name, ex. `set('Hours', 1.5)`."""
+        match field:
+            case 'Date': self.date = value
+            case 'Task': self.task = value
+            case 'Hours': self.hours = value
+            case 'Deliverable': self.deliverable = value
+            case 'key': self.key = value
+            case _:
+                self.extra = {**(self.extra or {}), field: value}
+
+    def __getitem__(self, field: str):
+        match field:
+            case 'Date': return self.date
+            case 'Task': return self.task
+            case 'Hours': return self.hours
+            case 'Deliverable': return self.deliverable
+            case 'key': return self.key
+        if self.extra and field in self.extra:
+            return self.extra[field]
+        raise KeyError(field)
+
+    def __iter__(self) -> Iterator[str]:
+        """Fields in the column order set in config.ini, then any extra fields."""
+        yield from _order
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(fields) + len(self.extra or ())
+
+    def __repr__(self) -> str:
+        return f"TaskRecord({self.to_item()!r})"
+
+
+def as_records(tasks: Mapping | Iterable[Mapping]) -> list[TaskRecord]:
+    """Converts a single task or many, as dicts or records, to a list of records."""
+    if isinstance(tasks, Mapping):
+        tasks = [tasks]
+    return [TaskRecord.from_item(task) for task in tasks]
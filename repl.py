@@ -0,0 +1,189 @@
+"""
+Interactive shell running CLI commands in one process. The month is fetched once
+and kept for the whole session, updated by the shell's own writes, so a sequence
+of commands costs a single fetch plus the writes. Offers history and tab completion
+of commands, options, task names and keys where `readline` is available.
+"""
+# Local imports
+import os
+import shlex
+
+# Project modules
+from config import Config
+from display import console
+import cache
+import profiling
+
+
+PROMPT = "loghours> "
+HISTORY_PATH = os.path.join(Config.cache_dir, "shell_history")
+
+# Typed in place of a command
+EXIT_WORDS = ("exit", "quit")
+
+
+def split_argument(line: str) -> tuple[list[str], str]:
+    """
+    Splits the text before the cursor into the finished arguments and the one
+    being typed, which may have an open quote, ex. `deliver "Write re`.
+    """
+    if line.count('"') % 2:
+        start = line.rindex('"')
+        return shlex.split(line[:start]), line[start + 1:]
+
+    start = max(line.rfind(' '), line.rfind('\t')) + 1
+    try:
+        return shlex.split(line[:start]), line[start:]
+    except ValueError:  # unbalanced single quotes
+        return line[:start].split(), line[start:]
+
+
+def complete_argument(
+    args: list[str],
+    current: str,
+    commands: dict[str, list[str]],
+    global_options: list[str],
+    tasks: list[str],
+    keys: list[str]
+) -> list[str]:
+    """
+    Candidates for the argument being typed. `commands` maps each command to its
+    options. Keys follow `--key`, and task names are offered everywhere else.
+    """
+    command_name = next((arg for arg in args if not arg.startswith('-')), None)
+
+    if command_name is None:
+        candidates = global_options if current.startswith('-') else [*commands, *EXIT_WORDS]
+    elif args[-1] == '--key':
+        candidates = keys
+    elif current.startswith('-'):
+        candidates = commands.get(command_name, [])
+    else:
+        candidates = tasks
+
+    return sorted(
+        {candidate for candidate in candidates if candidate.startswith(current)}
+    )
+
+
+def _options(command) -> list[str]:
+    """Option names of a click command, ex. `--key`."""
+    return [
+        opt for param in command.params for opt in param.opts + param.secondary_opts
+        if opt.startswith('-')
+    ]
+
+
+class Completer:
+    """`readline` completer over the session's commands and the current month."""
+    def __init__(self, command, work_log):
+        self._commands = {name: _options(sub) for name, sub in command.commands.items()}
+        self._global_options = _options(command)
+        self._work_log = work_log
+        self._matches: list[str] = []
+
+    def complete(self, text: str, state: int) -> str | None:
+        import readline
+
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            args, current = split_argument(line)
+            records = list(self._work_log.records())
+            candidates = complete_argument(
+                args,
+                current,
+                self._commands,
+                self._global_options,
+                tasks = [record.task for record in records],
+                keys = [record.key for record in records]
+            )
+            # Readline replaces only `text`, the part after the last delimiter
+            self._matches = [candidate[len(current) - len(text):] for candidate in candidates]
+
+        return self._matches[state] if state < len(self._matches) else None
+
+
+def _setup_readline(command, work_log) -> bool:
+    """Loads history and binds tab completion, returning whether readline is available."""
+    try:
+        import readline
+    except ImportError:  # ex. Windows
+        return False
+
+    readline.set_completer_delims(' \t\n"')
+    readline.set_completer(Completer(command, work_log).complete)
+    if 'libedit' in (readline.__doc__ or ''):  # macOS
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+    readline.set_history_length(1000)
+    try:
+        readline.read_history_file(HISTORY_PATH)
+    except OSError:
+        pass
+
+    return True
+
+
+def _save_history() -> None:
+    import readline
+
+    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+    readline.write_history_file(HISTORY_PATH)
+
+
+def run(app, work_log) -> None:
+    """Reads and runs commands until `exit` or Ctrl+D."""
+    import typer
+
+    command = typer.main.get_command(app)
+    cache.pinned = True
+    has_readline = _setup_readline(command, work_log)
+
+    console.print("")
+    console.print(
+        "Type any command without `loghours`, ex. `log` or `deliver \"Task\" link`. "
+        "Use `--help` to list them, `--refresh` before a command to fetch the month "
+        "again, and `exit` or Ctrl+D to leave."
+    )
+
+    try:
+        while True:
+            try:
+                line = input(PROMPT)
+            except KeyboardInterrupt:
+                console.print("")
+                continue
+            except EOFError:
+                console.print("")
+                return
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                console.print(f"Couldn't read that command: {e}.")
+                continue
+
+            if not args:
+                continue
+            if args[0] in EXIT_WORDS:
+                return
+            if next((arg for arg in args if not arg.startswith('-')), None) == 'shell':
+                console.print("You're already in the shell.")
+                continue
+
+            try:
+                command.main(args=args, prog_name="loghours")
+            except SystemExit:  # every command exits when it's done
+                pass
+            except KeyboardInterrupt:
+                console.print("")
+            except Exception:
+                console.print_exception()
+            finally:
+                profiling.reset()
+    finally:
+        cache.pinned = False
+        if has_readline:
+            _save_history()
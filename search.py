@@ -0,0 +1,267 @@
+"""
+Full-text search over the Task and Deliverable of every month. Each month has an
+inverted index in the cache directory, mapping words to the keys of the tasks that
+contain them, so a query over years of history only reads local files.
+
+The CLI's own writes update the index of their month. Each index also carries a
+watermark, when it was built and whether its month had ended by then: a closed
+month's index is final, while the current month's is rebuilt once it's older than
+the cache TTL, picking up changes made elsewhere. `--refresh` rebuilds every index.
+"""
+# Local imports
+from collections.abc import Iterable
+import bisect
+import dataclasses
+import math
+import os
+import re
+import time
+
+# Project modules
+from config import Config
+from records import TaskRecord
+import cache
+import storage
+
+
+# Words in task names count for more than words in deliverables
+field_weights: dict[str, int] = {'Task': 2, 'Deliverable': 1}
+
+# A word matching the start of a longer one, ex. 'doc' in 'docs', counts for less
+prefix_weight: float = 0.5
+
+# Looking back for the first months to index stops after this many empty months
+max_gap: int = 12
+
+# Letters and digits, so links are split into their parts on punctuation
+_word = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Case-folded words of `text`."""
+    if not text:
+        return []
+    return _word.findall(text.casefold())
+
+
+def _index_dir() -> str:
+    return os.path.join(Config.cache_dir, "search")
+
+
+class MonthIndex:
+    """Inverted index of one month, persisted as JSON."""
+    def __init__(self, name: str):
+        self.name = name
+        self.path = os.path.join(_index_dir(), f"{name}.json")
+
+        data = cache.read_json(self.path, default={})
+        self.indexed_at: float | None = data.get('indexed_at')
+        self.closed: bool = data.get('closed', False)
+        self.tasks: dict[str, dict] = data.get('tasks', {})
+        self.postings: dict[str, dict[str, int]] = data.get('postings', {})
+        self._vocabulary: list[str] | None = None
+
+    @property
+    def exists(self) -> bool:
+        return self.indexed_at is not None
+
+    def fresh(self) -> bool:
+        if not self.exists or cache.refresh:
+            return False
+        return self.closed or time.time() - self.indexed_at < Config.cache_ttl
+
+    def _weights(self, item: dict) -> dict[str, int]:
+        weights = {}
+        for field, weight in field_weights.items():
+            for word in tokenize(item.get(field)):
+                weights[word] = weights.get(word, 0) + weight
+        return weights
+
+    def add(self, record: TaskRecord) -> None:
+        """Indexes a task, replacing the one with the same key."""
+        self.remove(record.key)
+
+        item = record.to_item()
+        del item['key']
+        self.tasks[record.key] = item
+        for word, weight in self._weights(item).items():
+            self.postings.setdefault(word, {})[record.key] = weight
+        self._vocabulary = None
+
+    def remove(self, key: str) -> None:
+        if (item := self.tasks.pop(key, None)) is None:
+            return
+
+        for word in self._weights(item):
+            keys = self.postings[word]
+            del keys[key]
+            if not keys:
+                del self.postings[word]
+        self._vocabulary = None
+
+    def rebuild(self, records: Iterable[TaskRecord]) -> None:
+        self.tasks, self.postings = {}, {}
+        for record in records:
+            self.add(record)
+
+        self.indexed_at = time.time()
+        self.closed = cache.is_closed_month(self.name)
+
+    def save(self) -> None:
+        cache.write_json(
+            self.path,
+            {
+                'indexed_at': self.indexed_at,
+                'closed': self.closed,
+                'tasks': self.tasks,
+                'postings': self.postings
+            }
+        )
+
+    def matching(self, term: str) -> Iterable[tuple[str, float]]:
+        """Indexed words that are `term` or start with it, with how much they count."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+
+        start = bisect.bisect_left(self._vocabulary, term)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(term):
+                return
+            yield word, 1 if word == term else prefix_weight
+
+
+def record(
+    base_name: str,
+    removed: Iterable[TaskRecord] = (),
+    added: Iterable[TaskRecord] = ()
+) -> None:
+    """
+    Updates the index of a month after a write replaced the `removed` tasks with
+    the `added` ones. Months that haven't been indexed yet are left for the first
+    search to index in full.
+    """
+    index = MonthIndex(base_name)
+    if not index.exists:
+        return
+
+    for task in removed:
+        index.remove(task.key)
+    for task in added:
+        index.add(task)
+    index.save()
+
+
+def _load(names: list[str]) -> list[MonthIndex]:
+    """Indexes of the months, rebuilding stale ones from their months concurrently."""
+    indexes = [MonthIndex(name) for name in names]
+    stale = {index.name: index for index in indexes if not index.fresh()}
+
+    month_records = storage.map_months(
+        lambda name: list(storage.base(name).records()), list(stale)
+    )
+    for name, records in month_records.items():
+        stale[name].rebuild(records)
+        stale[name].save()
+
+    return indexes
+
+
+def _month_index(name: str) -> int:
+    month, year = storage.month_of(name)
+    return year * 12 + month - 1
+
+
+def _month_names(first: int, last: int) -> list[str]:
+    """Names of the months between two month indexes (`year * 12 + month - 1`)."""
+    return [storage.month_name(index % 12 + 1, index // 12) for index in range(first, last + 1)]
+
+
+def _indexed_months() -> list[str]:
+    if not os.path.isdir(_index_dir()):
+        return []
+
+    names = (os.path.splitext(file)[0] for file in os.listdir(_index_dir()))
+    return [name for name in names if storage.month_of(name) is not None]
+
+
+def load_indexes(names: list[str] = None) -> list[MonthIndex]:
+    """
+    Indexes of the months called `names`, or by default of every month, oldest
+    first: from the oldest month already indexed, or with SQLite, stored. The first
+    time, with Deta, months are indexed looking back from the current one until
+    `max_gap` of them in a row have no tasks.
+    """
+    if names is not None:
+        return _load(names)
+
+    current = Config.year * 12 + Config.month - 1
+    if (stored := storage.existing_months()) is not None:
+        first = min(map(_month_index, stored), default=current)
+        return _load(_month_names(first, current))
+
+    if indexed := _indexed_months():
+        return _load(_month_names(min(map(_month_index, indexed)), current))
+
+    indexes = []
+    last = current
+    while True:
+        batch = _load(_month_names(last - max_gap + 1, last))
+        indexes = batch + indexes
+        if not any(index.tasks for index in batch):
+            return indexes
+        last -= max_gap
+
+
+@dataclasses.dataclass
+class Hit:
+    """A task matching a search, with the number of query words it matched."""
+    base_name: str
+    record: TaskRecord
+    matched: int
+    score: float
+
+    @property
+    def monthyear(self) -> str:
+        month, year = storage.month_of(self.base_name)
+        return f"{month}-{year}"
+
+
+def search(query: str, indexes: list[MonthIndex], limit: int = 10) -> list[Hit]:
+    """
+    The tasks best matching `query`, most relevant first. Tasks matching more of
+    its words rank higher, then those whose matches are rarer across all months
+    (by inverse document frequency) and in their names rather than deliverables.
+    Each word also matches words it starts with, at a lower weight.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    total_tasks = sum(len(index.tasks) for index in indexes)
+
+    matched: dict[tuple[int, str], int] = {}
+    scores: dict[tuple[int, str], float] = {}
+    for term in terms:
+        # Best weight of the term in each task that has it
+        term_weights: dict[tuple[int, str], float] = {}
+        for position, index in enumerate(indexes):
+            for word, factor in index.matching(term):
+                for key, weight in index.postings[word].items():
+                    doc = (position, key)
+                    term_weights[doc] = max(term_weights.get(doc, 0), weight * factor)
+
+        if not term_weights:
+            continue
+
+        idf = math.log(1 + total_tasks / len(term_weights))
+        for doc, weight in term_weights.items():
+            matched[doc] = matched.get(doc, 0) + 1
+            scores[doc] = scores.get(doc, 0) + idf * weight
+
+    ranked = sorted(scores, key=lambda doc: (matched[doc], scores[doc]), reverse=True)
+    return [
+        Hit(
+            base_name = indexes[position].name,
+            record = TaskRecord.from_item({**indexes[position].tasks[key], 'key': key}),
+            matched = matched[(position, key)],
+            score = scores[(position, key)]
+        )
+        for position, key in ranked[:limit]
+    ]
@@ -0,0 +1,49 @@
+"""
+Shared HTTP sessions. Requests to the same host reuse one `requests.Session` with a
+pool of keep-alive connections, so a sequence of calls, like shortening every link
+in a report's appendix, only pays for the TCP and TLS handshakes once.
+
+Pool sizes, timeouts, and retries are set in the `HTTP` section of `config.ini`.
+"""
+# Local imports
+import threading
+import urllib.parse
+
+# Project modules
+from config import Config
+
+
+_sessions: dict = {}
+_lock = threading.Lock()
+
+
+def session(url: str):
+    """
+    The session for the host of `url`, created on first use. Requests is only
+    imported then, so commands that make no requests don't load it.
+    """
+    host = urllib.parse.urlsplit(url).netloc
+
+    with _lock:
+        if host not in _sessions:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            new_session = requests.Session()
+            # Retries only cover failed connections, never requests the server received
+            adapter = HTTPAdapter(
+                pool_connections = 1,
+                pool_maxsize = Config.http_pool_size,
+                max_retries = Config.http_retries
+            )
+            new_session.mount("https://", adapter)
+            new_session.mount("http://", adapter)
+            _sessions[host] = new_session
+
+        return _sessions[host]
+
+
+def request(method: str, url: str, **kwargs):
+    """Makes a request through the shared session, with the configured timeouts."""
+    kwargs.setdefault("timeout", Config.http_timeout)
+    return session(url).request(method, url, **kwargs)
@@ -0,0 +1,638 @@
+"""
+Storage backends for the work log. Every command talks to a `Base`, which mirrors
+the subset of the Deta Base API the CLI uses (get, put, fetch, delete, update).
+The backend is chosen in `config.ini`: either Deta, or a local SQLite database that
+stores one table per month.
+"""
+# Local imports
+from collections.abc import Callable, Iterator
+from typing import Any
+import abc
+import concurrent.futures
+import dataclasses
+import json
+import re
+import secrets
+import sqlite3
+import string
+
+# Project modules
+from config import Config
+from records import TaskRecord
+import profiling
+
+
+# Columns stored natively by the SQLite backend. Anything else goes in `Extra`.
+task_columns: tuple[str] = ('Date', 'Task', 'Hours', 'Deliverable')
+
+# Most items Deta accepts in a single `put_many`
+put_many_limit: int = 25
+
+# Key of the slot holding the unfinished (active) task. Inserting into it only
+# succeeds if it's empty, so at most one task can be active at a time.
+active_key: str = 'active'
+
+
+# Key of each month's summary record, see `summary.py`
+summary_key: str = 'summary'
+
+# Records that aren't tasks, left out of `Base.records`
+meta_keys: tuple[str] = (summary_key,)
+
+# Keys only the CLI itself writes tasks to, which can't be set by hand
+reserved_keys: tuple[str] = (active_key, *meta_keys)
+
+
+class KeyExistsError(Exception):
+    """Raised by `Base.insert` when an item already has the key."""
+
+
+class KeyMissingError(KeyError):
+    """Raised by `Base.update` when no item has the key."""
+
+
+class PutManyError(Exception):
+    """
+    Raised by `Base.put_many` when only some of the items were stored, with the
+    items that were and the positions of those that weren't.
+    """
+    def __init__(self, message: str, stored: list[dict], failed: list[int]):
+        super().__init__(message)
+        self.stored = stored
+        self.failed = failed
+
+
+@dataclasses.dataclass(frozen=True)
+class Increment:
+    """
+    Update value adding to a number instead of replacing it, like Deta's
+    `util.increment`. A missing field counts as zero.
+    """
+    value: int | float = 1
+
+
+def apply_updates(item: dict, updates: dict) -> dict:
+    """
+    Applies `update` style changes to `item` in place and returns it. Fields may be
+    paths into nested dicts, ex. `'TaskSeconds.Write report'`, like in Deta.
+    """
+    for path, value in updates.items():
+        *parents, field = path.split('.')
+        target = item
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        if isinstance(value, Increment):
+            target[field] = (target.get(field) or 0) + value.value
+        else:
+            target[field] = value
+
+    return item
+
+
+@dataclasses.dataclass
+class FetchResponse:
+    """Same shape as the response returned by `deta.Base.fetch`."""
+    items: list[dict]
+    count: int = 0
+    last: str | None = None
+
+    def __post_init__(self):
+        self.count = len(self.items)
+
+
+def generate_key() -> str:
+    """Random 12 character key, in the same style as the keys Deta generates."""
+    alphabet = string.ascii_lowercase + string.digits
+    return ''.join(secrets.choice(alphabet) for _ in range(12))
+
+
+def matches(item: dict, query: dict | list[dict] | None) -> bool:
+    """
+    Whether `item` satisfies a Deta style equality query. A dict query requires
+    every field to match, a list of dicts matches if any of them does.
+    """
+    if not query:
+        return True
+
+    if isinstance(query, list):
+        return any(matches(item, sub_query) for sub_query in query)
+
+    return all(item.get(field) == value for field, value in query.items())
+
+
+class Base(abc.ABC):
+    """A single month of the work log."""
+    def __init__(self, name: str):
+        self.name = name
+
+    @abc.abstractmethod
+    def get(self, key: str) -> dict | None:
+        """Returns the item with `key`, or `None` if it doesn't exist."""
+
+    @abc.abstractmethod
+    def put(self, data: dict, key: str = None) -> dict:
+        """Inserts or overwrites an item, generating a key if needed. Returns the item."""
+
+    def put_many(self, items: list[dict]) -> list[dict]:
+        """
+        Like `put` for many items, batched by backends that support it. Raises
+        `PutManyError` if some of them were stored but not all.
+        """
+        stored = []
+        for idx, item in enumerate(items):
+            try:
+                stored.append(self.put(item))
+            except Exception as e:
+                if not stored:
+                    raise
+                raise PutManyError(str(e), stored, list(range(idx, len(items)))) from e
+        return stored
+
+    @abc.abstractmethod
+    def insert(self, data: dict, key: str) -> dict:
+        """
+        Writes an item only if `key` is free, checking and writing in one atomic 
+        operation. Raises `KeyExistsError` otherwise.
+        """
+
+    @abc.abstractmethod
+    def fetch(
+        self,
+        query: dict | list[dict] = None,
+        limit: int = 1000,
+        last: str = None
+    ) -> FetchResponse:
+        """Fetches items matching `query`, one page of at most `limit` items."""
+
+    def iterate(self, query: dict | list[dict] = None, page_size: int = 1000) -> Iterator[dict]:
+        """
+        Yields every item matching `query`, fetching the next page only once the
+        previous one has been consumed. Unlike a single `fetch`, months larger than
+        one page aren't truncated.
+        """
+        last = None
+        while True:
+            response = self.fetch(query, limit=page_size, last=last)
+            yield from response.items
+            if not (last := response.last):
+                return
+
+    def records(self, query: dict | list[dict] = None) -> Iterator[TaskRecord]:
+        """
+        Like `iterate`, converting each item to a `TaskRecord` as it arrives. Meta
+        records, like the month's summary, are skipped.
+        """
+        return (
+            TaskRecord.from_item(item) for item in self.iterate(query)
+            if item['key'] not in meta_keys
+        )
+
+    def get_record(self, key: str) -> TaskRecord | None:
+        """Like `get`, converting the item to a `TaskRecord`. Meta records aren't tasks."""
+        if key in meta_keys:
+            return None
+
+        item = self.get(key)
+        return TaskRecord.from_item(item) if item else None
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Deletes the item with `key`. Deleting a missing key is not an error."""
+
+    @abc.abstractmethod
+    def update(self, updates: dict, key: str) -> None:
+        """
+        Sets the fields in `updates` on an existing item, see `apply_updates`, in one
+        atomic operation, so concurrent `Increment`s all count. Raises
+        `KeyMissingError` if the item doesn't exist.
+        """
+
+
+# ---- Deta ----
+
+
+_deta_client = None
+
+
+def _get_deta_client():
+    """Creates the Deta client on first use."""
+    global _deta_client
+
+    if _deta_client is None:
+        import deta
+        import keys
+        _deta_client = deta.Deta(keys.Deta.project_key)
+
+    return _deta_client
+
+
+class DetaBase(Base):
+    """
+    Thin wrapper around a Deta Base. The SDK is only loaded on the first request,
+    so commands that never reach Deta don't pay for importing it.
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._deta_base = None
+
+    @property
+    def _base(self):
+        if self._deta_base is None:
+            self._deta_base = _get_deta_client().Base(self.name)
+        return self._deta_base
+
+    @profiling.timed("deta")
+    def get(self, key: str) -> dict | None:
+        item = self._base.get(key)
+        profiling.count_request("Deta", len(key), profiling.payload_size(item))
+        return item
+
+    @profiling.timed("deta")
+    def put(self, data: dict, key: str = None) -> dict:
+        item = self._base.put(data, key)
+        profiling.count_request("Deta", profiling.payload_size(data), profiling.payload_size(item))
+        return item
+
+    @profiling.timed("deta")
+    def insert(self, data: dict, key: str) -> dict:
+        try:
+            item = self._base.insert(data, key)
+        except Exception as e:
+            # The SDK raises a plain exception when Deta responds with a conflict
+            if "already exists" in str(e):
+                raise KeyExistsError(f"Key '{key}' already exists in {self.name}.") from e
+            raise
+        finally:
+            profiling.count_request("Deta", profiling.payload_size(data))
+        return item
+
+    @profiling.timed("deta")
+    def put_many(self, items: list[dict]) -> list[dict]:
+        """
+        Writes `put_many_limit` items per request. A failed request doesn't stop the
+        rest, and keys are generated here so the items it held can be told apart.
+        """
+        items = [{**item, 'key': item.get('key') or generate_key()} for item in items]
+        stored, error = [], None
+        for start in range(0, len(items), put_many_limit):
+            chunk = items[start:start + put_many_limit]
+            try:
+                response = self._base.put_many(chunk)
+            except Exception as e:
+                error = e
+                continue
+            profiling.count_request(
+                "Deta", profiling.payload_size(chunk), profiling.payload_size(response)
+            )
+            stored.extend(response['processed']['items'])
+
+        if len(stored) == len(items):
+            return stored
+
+        message = f"Deta failed to store {len(items) - len(stored)} items in {self.name}."
+        if not stored:
+            raise Exception(message) from error
+
+        stored_keys = {item['key'] for item in stored}
+        raise PutManyError(
+            message,
+            stored,
+            [idx for idx, item in enumerate(items) if item['key'] not in stored_keys]
+        ) from error
+
+    @profiling.timed("deta")
+    def fetch(
+        self,
+        query: dict | list[dict] = None,
+        limit: int = 1000,
+        last: str = None
+    ) -> FetchResponse:
+        response = self._base.fetch(query, limit=limit, last=last)
+        profiling.count_request(
+            "Deta", profiling.payload_size(query), profiling.payload_size(response.items)
+        )
+        return FetchResponse(response.items, last=response.last)
+
+    @profiling.timed("deta")
+    def delete(self, key: str) -> None:
+        self._base.delete(key)
+        profiling.count_request("Deta", len(key))
+
+    @profiling.timed("deta")
+    def update(self, updates: dict, key: str) -> None:
+        deta_updates = {
+            path: self._base.util.increment(value.value) if isinstance(value, Increment) else value
+            for path, value in updates.items()
+        }
+        try:
+            self._base.update(deta_updates, key)
+        except Exception as e:
+            # The SDK raises a plain exception when Deta responds with a 404
+            if "not found" in str(e):
+                raise KeyMissingError(f"Key '{key}' not found in {self.name}.") from e
+            raise
+        finally:
+            profiling.count_request("Deta", profiling.payload_size(updates))
+
+
+# ---- SQLite ----
+
+
+_sqlite_connection = None
+
+
+def _get_sqlite_connection() -> sqlite3.Connection:
+    global _sqlite_connection
+
+    if _sqlite_connection is None:
+        _sqlite_connection = sqlite3.connect(Config.sqlite_path)
+
+    return _sqlite_connection
+
+
+class SQLiteBase(Base):
+    """
+    One table per month, named after the Base. `Task` is indexed for name lookups,
+    and a partial index covers unfinished (`Hours IS NULL`) rows for clocking out.
+    Fields other than the standard task columns are stored as JSON in `Extra`.
+    """
+    def __init__(self, name: str, connection: sqlite3.Connection = None):
+        super().__init__(name)
+        self._connection = connection or _get_sqlite_connection()
+        self._table = '"' + name.replace('"', '""') + '"'
+        self._created = False
+
+    def _table_exists(self) -> bool:
+        """
+        Whether the month's table exists. Until it does, this is checked on every
+        read, since another process, ex. one run alongside the daemon, may create it.
+        """
+        if not self._created:
+            self._created = self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (self.name,)
+            ).fetchone() is not None
+        return self._created
+
+    def _create_table(self) -> None:
+        """Tables are only created on the first write so reads don't create months."""
+        if self._created:
+            return
+
+        index_prefix = self.name.replace('"', '""')
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, Date TEXT, Task TEXT, Hours REAL, "
+                "Deliverable TEXT, Extra TEXT)"
+            )
+            self._connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{index_prefix}_task" '
+                f"ON {self._table} (Task)"
+            )
+            self._connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{index_prefix}_unfinished" '
+                f"ON {self._table} (key) WHERE Hours IS NULL"
+            )
+        self._created = True
+
+    @staticmethod
+    def _to_item(row: tuple) -> dict:
+        key, date, task, hours, deliverable, extra = row
+        item = {
+            'Date': date,
+            'Task': task,
+            'Hours': hours,
+            'Deliverable': deliverable,
+            'key': key
+        }
+        if extra:
+            item.update(json.loads(extra))
+        return item
+
+    @staticmethod
+    def _to_row(item: dict) -> tuple:
+        extra = {
+            field: val for field, val in item.items()
+            if field not in task_columns and field != 'key'
+        }
+        return (
+            item['key'],
+            *(item.get(column) for column in task_columns),
+            json.dumps(extra) if extra else None
+        )
+
+    @staticmethod
+    def _where(query: dict | list[dict] | None) -> tuple[str, list] | None:
+        """
+        Translates a query into a SQL condition. Returns `None` if the query uses
+        fields that aren't columns, in which case it's filtered in Python instead.
+        """
+        if not query:
+            return "1", []
+
+        sub_queries = query if isinstance(query, list) else [query]
+        clauses, params = [], []
+        for sub_query in sub_queries:
+            conditions = []
+            for field, value in sub_query.items():
+                if field not in task_columns and field != 'key':
+                    return None
+                if value is None:
+                    conditions.append(f"{field} IS NULL")
+                else:
+                    conditions.append(f"{field} = ?")
+                    params.append(value)
+            clauses.append("(" + (" AND ".join(conditions) or "1") + ")")
+
+        return " OR ".join(clauses), params
+
+    @profiling.timed("sqlite")
+    def get(self, key: str) -> dict | None:
+        if not self._table_exists():
+            return None
+
+        row = self._connection.execute(
+            f"SELECT * FROM {self._table} WHERE key = ?", (key,)
+        ).fetchone()
+        return self._to_item(row) if row else None
+
+    @profiling.timed("sqlite")
+    def put(self, data: dict, key: str = None) -> dict:
+        self._create_table()
+
+        item = dict(data)
+        item['key'] = key or item.get('key') or generate_key()
+        with self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?, ?, ?)",
+                self._to_row(item)
+            )
+        return item
+
+    @profiling.timed("sqlite")
+    def insert(self, data: dict, key: str) -> dict:
+        self._create_table()
+
+        item = {**data, 'key': key}
+        try:
+            with self._connection:
+                self._connection.execute(
+                    f"INSERT INTO {self._table} VALUES (?, ?, ?, ?, ?, ?)",
+                    self._to_row(item)
+                )
+        except sqlite3.IntegrityError as e:
+            raise KeyExistsError(f"Key '{key}' already exists in {self.name}.") from e
+        return item
+
+    @profiling.timed("sqlite")
+    def put_many(self, items: list[dict]) -> list[dict]:
+        """Writes every item in a single transaction."""
+        self._create_table()
+
+        items = [{**item, 'key': item.get('key') or generate_key()} for item in items]
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?, ?, ?)",
+                map(self._to_row, items)
+            )
+        return items
+
+    @profiling.timed("sqlite")
+    def fetch(
+        self,
+        query: dict | list[dict] = None,
+        limit: int = 1000,
+        last: str = None
+    ) -> FetchResponse:
+        if not self._table_exists():
+            return FetchResponse([])
+
+        where = self._where(query)
+        sql_filter = where is not None
+        condition, params = where if sql_filter else ("1", [])
+
+        if last is not None:
+            condition = f"({condition}) AND key > ?"
+            params = [*params, last]
+
+        rows = self._connection.execute(
+            f"SELECT * FROM {self._table} WHERE {condition} ORDER BY key", params
+        )
+
+        items = []
+        for row in rows:
+            item = self._to_item(row)
+            if not sql_filter and not matches(item, query):
+                continue
+            if len(items) == limit:
+                return FetchResponse(items, last=items[-1]['key'])
+            items.append(item)
+
+        return FetchResponse(items)
+
+    @profiling.timed("sqlite")
+    def delete(self, key: str) -> None:
+        if not self._table_exists():
+            return
+
+        with self._connection:
+            self._connection.execute(
+                f"DELETE FROM {self._table} WHERE key = ?", (key,)
+            )
+
+    @profiling.timed("sqlite")
+    def update(self, updates: dict, key: str) -> None:
+        """Reads and writes the item in one write transaction, so it's atomic."""
+        if not self._table_exists():
+            raise KeyMissingError(f"Key '{key}' not found in {self.name}.")
+
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            row = self._connection.execute(
+                f"SELECT * FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyMissingError(f"Key '{key}' not found in {self.name}.")
+
+            item = apply_updates(self._to_item(row), updates)
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?, ?, ?)",
+                self._to_row(item)
+            )
+
+
+# ---- Access ----
+
+
+backends: dict[str, type[Base]] = {
+    'deta': DetaBase,
+    'sqlite': SQLiteBase
+}
+
+_bases: dict[str, Base] = {}
+
+
+def base(name: str) -> Base:
+    """
+    Returns the Base called `name` using the backend configured in `config.ini`.
+    Bases are created once per process and reused. Deta Bases are wrapped in the
+    local cache if it's enabled.
+    """
+    if name not in _bases:
+        db = backends[Config.storage_backend](name)
+        if Config.cache_enabled and Config.storage_backend == 'deta':
+            import cache
+            db = cache.CachedBase(db)
+        _bases[name] = db
+
+    return _bases[name]
+
+
+def month_name(month: int | str, year: int | str) -> str:
+    """Name of the Base holding the work log for a month, ex. `work_log_7_2022`."""
+    return Config.db_basename + f"_{month}_{year}"
+
+
+def month_of(name: str) -> tuple[int, int] | None:
+    """The `(month, year)` of a Base name, or `None` if it isn't a month of the log."""
+    match = re.fullmatch(re.escape(Config.db_basename) + r"_(\d{1,2})_(\d{4})", name)
+    if not match:
+        return None
+
+    return int(match.group(1)), int(match.group(2))
+
+
+def existing_months() -> list[str] | None:
+    """
+    Names of every month of the log that has been stored, oldest first, if the
+    backend can list them. Deta can't, so `None` is returned.
+    """
+    if Config.storage_backend != 'sqlite':
+        return None
+
+    tables = _get_sqlite_connection().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )
+    names = [name for name, in tables if month_of(name) is not None]
+    return sorted(names, key=lambda name: month_of(name)[::-1])  # by year, then month
+
+
+def map_months(func: Callable[[str], Any], names: list[str]) -> dict[str, Any]:
+    """
+    Calls `func` with each Base name, returning the results in the same order as
+    `names`. With Deta, names are handled concurrently with at most `max_workers`
+    (config.ini) at a time, so a year takes about as long as its slowest month.
+    """
+    # SQLite connections can't be shared across threads, and are local anyway
+    if Config.storage_backend != 'deta':
+        return {name: func(name) for name in names}
+
+    with concurrent.futures.ThreadPoolExecutor(Config.storage_workers) as executor:
+        return dict(zip(names, executor.map(func, names)))
+
+
+def fetch_months(names: list[str]) -> dict[str, list[TaskRecord]]:
+    """Fetches every record of several Bases, concurrently, see `map_months`."""
+    return map_months(lambda name: list(base(name).records()), names)
@@ -0,0 +1,146 @@
+"""
+Monthly summary record, stored under `storage.summary_key` in each month's Base
+alongside its tasks: total seconds, counts of tasks, unfinished tasks and undelivered
+tasks, and seconds per task name. Every write through the CLI adjusts it with atomic
+increments, so totals are a single keyed get instead of fetching the whole month.
+
+The task in the active slot isn't counted until it's clocked out, so clocking in
+stays a single request. It has no hours yet, so totals are the same either way, and
+`rebuild`, which reads every task, adds it to the summary it returns.
+
+A month without a summary, ex. one logged before it existed, gets one built from
+its tasks on first use. `reconcile` rebuilds it from scratch.
+"""
+# Local imports
+from collections.abc import Iterable
+from collections import Counter
+
+# Project modules
+from records import TaskRecord
+import storage
+
+
+# Counters of the summary, ex. `{'Seconds': 7200, 'Tasks': 3, ...}`
+counters: tuple[str] = ('Seconds', 'Tasks', 'Unfinished', 'Undelivered')
+
+# Field holding seconds per task name
+task_seconds_field: str = 'TaskSeconds'
+
+
+def _escape(name: str) -> str:
+    """Task names are field names in update paths, where dots separate fields."""
+    return name.replace('%', '%25').replace('.', '%2E')
+
+
+def _unescape(field: str) -> str:
+    return field.replace('%2E', '.').replace('%25', '%')
+
+
+def _contribution(record: TaskRecord) -> Counter:
+    """What a single task adds to the summary, as update paths and amounts."""
+    seconds = record.seconds or 0
+    return Counter(
+        {
+            'Seconds': seconds,
+            'Tasks': 1,
+            'Unfinished': record.hours is None,
+            'Undelivered': record.deliverable is None,
+            f"{task_seconds_field}.{_escape(record.task)}": seconds
+        }
+    )
+
+
+def changes(
+    removed: Iterable[TaskRecord] = (),
+    added: Iterable[TaskRecord] = ()
+) -> dict[str, int]:
+    """
+    Net change to the summary from replacing the `removed` tasks with the `added`
+    ones. The active task is left out, as it's only counted once clocked out.
+    """
+    net = Counter()
+    for record in added:
+        if record.key != storage.active_key:
+            net.update(_contribution(record))
+    for record in removed:
+        if record.key != storage.active_key:
+            net.subtract(_contribution(record))
+
+    return {path: amount for path, amount in net.items() if amount}
+
+
+def build(records: Iterable[TaskRecord]) -> dict:
+    """A full summary item of the `records`, leaving out the active task."""
+    item = {counter: 0 for counter in counters}
+    item[task_seconds_field] = {}
+    return storage.apply_updates(
+        item,
+        {path: storage.Increment(amount) for path, amount in changes(added=records).items()}
+    )
+
+
+def rebuild(base: storage.Base, missing: bool = False) -> dict:
+    """
+    Replaces the summary of `base` with one built from all of its tasks. Months
+    without tasks aren't given one, so reading a month that was never logged
+    doesn't create it. Pass `missing` if the month is known to have no summary,
+    so an empty month isn't written to at all.
+
+    The summary returned also counts the active task, ex. for `reconcile` to report.
+    """
+    records = list(base.records())
+    item = build(records)
+    if item['Tasks']:
+        item = base.put(item, storage.summary_key)
+    elif not missing and base.get(storage.summary_key) is not None:
+        base.delete(storage.summary_key)
+
+    item = dict(item)  # not the copy a cache keeps
+    for record in records:
+        if record.key == storage.active_key:
+            for path, amount in _contribution(record).items():
+                if amount:
+                    item[path] += amount
+    return item
+
+
+def load(base: storage.Base) -> dict:
+    """
+    The summary of `base`, built first if the month doesn't have one yet. Its counts
+    leave out the active task.
+    """
+    return base.get(storage.summary_key) or rebuild(base, missing=True)
+
+
+def record(
+    base: storage.Base,
+    removed: Iterable[TaskRecord] = (),
+    added: Iterable[TaskRecord] = ()
+) -> None:
+    """
+    Adjusts the summary of `base` after a write replaced the `removed` tasks with
+    the `added` ones. Call it once the write has been made, since a missing summary
+    is built from the month as it is then.
+    """
+    if not (net := changes(removed, added)):
+        return
+
+    try:
+        base.update(
+            {path: storage.Increment(amount) for path, amount in net.items()},
+            storage.summary_key
+        )
+    except storage.KeyMissingError:
+        rebuild(base, missing=True)
+
+
+def hours(summary: dict) -> float:
+    return summary['Seconds'] / 3600
+
+
+def task_hours(summary: dict) -> dict[str, float]:
+    """Hours per task name, leaving out names that no longer have any."""
+    return {
+        _unescape(field): seconds / 3600
+        for field, seconds in summary.get(task_seconds_field, {}).items() if seconds
+    }
@@ -0,0 +1,28 @@
+import sqlite3
+
+import pytest
+
+import storage
+from records import TaskRecord
+
+
+@pytest.fixture
+def make_record():
+    """Builds tasks dated within August 2022, unfinished unless given hours."""
+    def make(
+        task: str = "A",
+        hours: float = None,
+        deliverable: str = None,
+        key: str = None
+    ) -> TaskRecord:
+        return TaskRecord.from_item(
+            {"Date": "2022-08-15 18-30", "Task": task, "Hours": hours, "Deliverable": deliverable, "key": key}
+        )
+
+    return make
+
+
+@pytest.fixture
+def base() -> storage.SQLiteBase:
+    """An empty month, August 2022, in an in-memory SQLite database."""
+    return storage.SQLiteBase("work_log_8_2022", connection=sqlite3.connect(":memory:"))
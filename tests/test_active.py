@@ -0,0 +1,81 @@
+import active
+import cli
+import storage
+from config import Config
+
+
+def test_pointer_round_trip(tmp_path, monkeypatch, make_record):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    assert active.load() is None
+
+    active.save("work_log_8_2022", make_record(key=storage.active_key))
+    base_name, record = active.load()
+    assert base_name == "work_log_8_2022" and record.task == "A" and record.hours is None
+
+    active.clear()
+    active.clear()  # already gone
+    assert active.load() is None
+
+
+def test_track_follows_the_active_task(tmp_path, monkeypatch, make_record):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    active.save("work_log_8_2022", make_record(key=storage.active_key))
+
+    # Other tasks and other months' active slots are ignored
+    active.track("work_log_8_2022", "abc", None)
+    active.track("work_log_9_2022", storage.active_key, None)
+    assert active.load() is not None
+
+    delivered = make_record(key=storage.active_key)
+    delivered.deliverable = "link"
+    active.track("work_log_8_2022", storage.active_key, delivered)
+    assert active.load()[1].deliverable == "link"
+
+    active.track("work_log_8_2022", storage.active_key, make_record(hours=1.0, key=storage.active_key))
+    assert active.load() is None
+
+
+def test_clockout_moves_legacy_task_into_the_slot(tmp_path, monkeypatch, make_record, base):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    base.put(make_record(key="legacy").to_item())
+
+    cli.clockout(hours=1.0, deliver=None, key=None)
+
+    # Finished through the active slot, which is free again
+    assert base.get("legacy") is None and base.get(storage.active_key) is None
+    finished, = base.records()
+    assert finished.task == "A" and finished.hours == 1.0
+
+
+def test_clockout_checks_the_pointer_against_the_slot(tmp_path, monkeypatch, make_record, base):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    monkeypatch.setattr(storage, "base", lambda name: base)
+
+    # Clocked out elsewhere: nothing is written
+    active.save(base.name, make_record(key=storage.active_key))
+    cli.clockout(hours=1.0, deliver=None, key=None)
+    assert active.load() is None and list(base.records()) == []
+
+    base.put(make_record(key=storage.active_key).to_item())
+    active.save(base.name, make_record(key=storage.active_key))
+    cli.clockout(hours=1.0, deliver=None, key=None)
+    assert active.load() is None and base.get(storage.active_key) is None
+    assert [task.hours for task in base.records()] == [1.0]
+
+
+def test_modify_hours_finishes_the_active_task(tmp_path, monkeypatch, make_record, base):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    base.put(make_record(key=storage.active_key).to_item())
+    active.save(base.name, make_record(key=storage.active_key))
+
+    cli.modify("A", "hours", "2", key=None)
+    assert base.get(storage.active_key) is None and active.load() is None
+    assert [task.hours for task in base.records()] == [2.0]
+
+    # The active slot can't be given a task by hand
+    finished, = base.records()
+    cli.modify("A", "key", storage.active_key, key=None)
+    assert [task.key for task in base.records()] == [finished.key]
@@ -0,0 +1,20 @@
+from benchmarks import workload
+from benchmarks import run
+
+
+def test_workload_is_seeded():
+    month = workload.generate_month(300, seed=1)
+    assert month == workload.generate_month(300, seed=1)
+    assert month != workload.generate_month(300, seed=2)
+
+    assert len(month) == 300
+    assert [item["Task"] for item in month].count(workload.probe_task) == 1
+    assert any(item["Hours"] is None for item in month)
+    assert any((item["Deliverable"] or "").startswith("https://") for item in month)
+    assert len({item["Task"] for item in month}) < 300
+
+
+def test_benchmarks_run_offline():
+    results = run.run_benchmarks([10], repeats=1)
+    assert set(results) == set(run.benchmarks)
+    assert all(isinstance(by_size["10"], float) for by_size in results.values())
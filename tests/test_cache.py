@@ -0,0 +1,96 @@
+import sqlite3
+
+import cache
+import storage
+from config import Config
+
+
+class CountingBase(storage.SQLiteBase):
+    def __init__(self, name: str):
+        super().__init__(name, connection=sqlite3.connect(":memory:"))
+        self.fetches = 0
+
+    def fetch(self, *args, **kwargs):
+        self.fetches += 1
+        return super().fetch(*args, **kwargs)
+
+
+def test_reads_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    remote = CountingBase(Config.current_db)
+    remote.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": None, "Deliverable": None}, "a")
+
+    db = cache.CachedBase(remote)
+    assert db.fetch({"Hours": None}).count == 1
+    assert db.fetch().count == 1
+    assert db.get("a")["Task"] == "A"
+    assert remote.fetches == 1
+
+    # Writes update the cache without another fetch
+    db.put({"Date": "2022-08-16 18-30", "Task": "B", "Hours": 1.0, "Deliverable": None}, "b")
+    db.delete("a")
+    assert [item["key"] for item in db.fetch().items] == ["b"]
+
+    # A new process reads the copy on disk
+    assert cache.CachedBase(remote).fetch().count == 1
+    assert remote.fetches == 1
+
+
+def test_reloads_copy_written_by_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    remote = CountingBase(Config.current_db)
+    remote.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.0, "Deliverable": None}, "a")
+
+    # A long-lived process, like the daemon, and a command run alongside it
+    daemon_db = cache.CachedBase(remote)
+    assert daemon_db.fetch().count == 1
+
+    cache.CachedBase(remote).put(
+        {"Date": "2022-08-16 18-30", "Task": "B", "Hours": 2.0, "Deliverable": None}, "b"
+    )
+    assert [item["key"] for item in daemon_db.fetch().items] == ["a", "b"]
+    assert remote.fetches == 1
+
+
+def test_refresh_and_closed_months(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    assert cache.is_closed_month("work_log_7_2022")
+    assert not cache.is_closed_month(Config.current_db)
+
+    remote = CountingBase(Config.current_db)
+    cache.CachedBase(remote).fetch()
+
+    monkeypatch.setattr(cache, "refresh", True)
+    db = cache.CachedBase(remote)
+    db.fetch()
+    db.fetch()
+    assert remote.fetches == 2
+
+
+def test_persistent_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    lru = cache.PersistentLRU("capitalizations", max_size=2)
+    assert lru.get("a") is None
+    lru.set("a", "A")
+    lru.set("b", "B")
+    assert lru.get("a") == "A"
+    lru.set("c", "C")  # evicts b, the least recently used
+
+    reloaded = cache.PersistentLRU("capitalizations", max_size=2)
+    assert reloaded.get("b") is None and reloaded.get("a") == "A" and reloaded.get("c") == "C"
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_pinned_months_stay_fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(Config, "cache_ttl", 0)
+    remote = CountingBase(Config.current_db)
+
+    db = cache.CachedBase(remote)
+    db.fetch()
+    db.fetch()
+    assert remote.fetches == 2
+
+    monkeypatch.setattr(cache, "pinned", True)
+    db.fetch()
+    assert remote.fetches == 2
@@ -0,0 +1,48 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import daemon
+
+
+def test_forward_without_daemon(monkeypatch, tmp_path):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", str(tmp_path / "missing.sock"))
+    assert daemon.forward(["log"]) is None
+    assert not daemon.is_running()
+
+
+def test_command_name_skips_option_values():
+    assert daemon._command_name(["--profile-output", "trace.json", "shell"]) == "shell"
+    assert daemon._command_name(["--profile-output=trace.json", "--refresh", "log"]) == "log"
+    assert daemon._command_name(["--profile"]) is None
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+def test_daemon_serves_commands(monkeypatch, tmp_path, capsys):
+    socket_path = str(tmp_path / "loghours.sock")
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    server = subprocess.Popen(
+        [sys.executable, "-c", "import daemon; daemon.serve()"],
+        cwd = daemon.REPO_DIR,
+        env = {**os.environ, "LOGHOURS_SOCKET": socket_path}
+    )
+    try:
+        for _ in range(200):
+            if daemon.is_running():
+                break
+            time.sleep(0.05)
+
+        assert daemon.forward(["--help"]) == 0
+        assert "clockin" in capsys.readouterr().out
+        assert daemon.forward(["nonexistent"]) == 2
+        assert daemon.forward(["daemon", "--stop"]) is None  # never forwarded
+
+        assert daemon.stop()
+        assert server.wait(timeout=5) == 0
+        assert not daemon.is_running()
+    finally:
+        server.kill()
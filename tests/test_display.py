@@ -0,0 +1,31 @@
+from config import Config
+import display
+
+
+def make_tasks(count: int) -> list[dict]:
+    return [
+        {"Date": f"2022-08-{idx % 28 + 1:02d} 10-{idx % 60:02d}", "Task": f"T{idx}", "Hours": 1.0, "Deliverable": None, "key": f"k{idx}"}
+        for idx in range(count)
+    ]
+
+
+def test_select_page_matches_full_sort():
+    tasks = make_tasks(95)
+    ordered = display._reorder_dicts(tasks)
+
+    window, total = display.select_page(iter(tasks), page=3, limit=10)
+    assert total == 95
+    assert window == ordered[20:30]
+
+    last, _ = display.select_page(tasks, page=10, limit=10)
+    assert last == ordered[90:]
+
+    beyond, total = display.select_page(tasks, page=11, limit=10)
+    assert beyond == [] and total == 95
+
+
+def test_display_page_caption():
+    with display.console.capture() as capture:
+        display.display_page(make_tasks(30), page=2, limit=Config.page_size)
+
+    assert "Page 2 of 2 (30 tasks)" in capture.get()
@@ -0,0 +1,111 @@
+import sqlite3
+
+import cli
+import export
+import importer
+import records
+import storage
+import summary
+
+
+def use_sqlite(monkeypatch) -> dict[str, storage.SQLiteBase]:
+    connection = sqlite3.connect(":memory:")
+    bases = {}
+    monkeypatch.setattr(storage.Config, "storage_backend", "sqlite")
+    monkeypatch.setattr(
+        storage, "base", lambda name: bases.setdefault(name, storage.SQLiteBase(name, connection))
+    )
+    return bases
+
+
+def test_import_exported_csv(monkeypatch, tmp_path):
+    bases = use_sqlite(monkeypatch)
+    tasks = records.as_records(
+        [
+            {"Date": "2022-07-31 23-30", "Task": "Report", "Hours": 1.5, "Deliverable": "https://example.com"},
+            {"Date": "2022-08-01 09-00", "Task": "Review", "Hours": None, "Deliverable": None}
+        ]
+    )
+    path = tmp_path / "tasks.csv"
+    export.write_csv(tasks, str(path))
+
+    result = importer.import_file(str(path), cli.database_types, titlecase=False)
+
+    assert result.imported == {"7-2022": 1, "8-2022": 1} and result.errors == []
+    july = list(bases[storage.month_name(7, 2022)].records())
+    assert july[0]["Deliverable"] == "https://example.com" and july[0]["Hours"] == 1.5
+
+
+def test_import_jsonl_reports_bad_rows(monkeypatch, tmp_path):
+    bases = use_sqlite(monkeypatch)
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(
+        '{"Date": "2022-08-01 09-00", "Task": "one", "Hours": 2}\n'
+        '\n'
+        '{"Date": "2022-08-02 09-00", "Task": "two", "Hours": "lots"}\n'
+        '{"Date": "yesterday", "Task": "three"}\n'
+        '{not json}\n'
+        '{"Date": "2022-08-03 09-00", "Task": "four", "Rate": 20}\n'
+        '{"Date": "2022-08-04 09-00", "Task": "five", "Hours": 1, "key": "fixed"}\n'
+        '{"Date": "2022-08-05 09-00", "Task": "six"}\n'
+        '{"Date": "2022-08-06 09-00", "Task": "seven", "Hours": 1, "key": "active"}\n'
+        '{"Date": "2022-08-07 09-00", "Task": "eight", "Hours": 1, "key": "summary"}\n'
+    )
+
+    result = importer.import_file(str(path), cli.database_types, titlecase=False)
+
+    assert result.imported == {"8-2022": 2}
+    assert [line_num for line_num, _ in result.errors] == [3, 4, 5, 6, 8, 9, 10]
+    assert "Unfinished" in result.errors[4][1]
+    assert all("reserved" in error for _, error in result.errors[5:])
+    assert bases[storage.month_name(8, 2022)].get("fixed")["Task"] == "five"
+
+
+def test_import_keeps_exported_names(monkeypatch, tmp_path):
+    from typer.testing import CliRunner
+
+    bases = use_sqlite(monkeypatch)
+    name = "Alex Smith: Session 1 Lesson and Feedback"
+    path = tmp_path / "tasks.csv"
+    export.write_csv(
+        records.as_records([{"Date": "2022-08-01 09-00", "Task": name, "Hours": 1.0, "Deliverable": None}]),
+        str(path)
+    )
+
+    result = CliRunner().invoke(cli.app, ["import", str(path)])
+
+    assert result.exit_code == 0
+    assert [task.task for task in bases[storage.month_name(8, 2022)].records()] == [name]
+
+
+def test_import_reports_only_rows_that_failed(monkeypatch, tmp_path):
+    class FlakyBase(storage.SQLiteBase):
+        put_many = storage.Base.put_many  # one put per item
+
+        def put(self, data, key=None):
+            if data.get("Task") == "bad":
+                raise Exception("rejected")
+            return super().put(data, key)
+
+    base = FlakyBase(storage.month_name(8, 2022), sqlite3.connect(":memory:"))
+    monkeypatch.setattr(storage, "base", lambda name: base)
+    monkeypatch.setattr(storage.Config, "storage_backend", "sqlite")
+    monkeypatch.setattr(storage.Config, "cache_dir", str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise Exception("timed out")
+    monkeypatch.setattr(summary, "record", fail)
+
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(
+        '{"Date": "2022-08-01 09-00", "Task": "one", "Hours": 1}\n'
+        '{"Date": "2022-08-02 09-00", "Task": "bad", "Hours": 1}\n'
+        '{"Date": "2022-08-03 09-00", "Task": "three", "Hours": 1}\n'
+    )
+
+    result = importer.import_file(str(path), cli.database_types)
+
+    # The stored row counts, and the summary is rebuilt instead of adjusted
+    assert result.imported == {"8-2022": 1} and result.warnings == []
+    assert [line_num for line_num, _ in result.errors] == [2, 3]
+    assert summary.load(base)["Tasks"] == 1
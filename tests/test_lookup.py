@@ -0,0 +1,63 @@
+import cli
+import lookup
+from config import Config
+
+
+items = [
+    {"Date": "2022-08-15 18-30", "Task": "Molly Gray: Session 3", "Hours": 1.2, "Deliverable": "link", "key": "a"},
+    {"Date": "2022-08-16 18-30", "Task": "Molly Gray: Session 3", "Hours": 1.0, "Deliverable": None, "key": "b"},
+    {"Date": "2022-08-17 18-30", "Task": "molly gray: session 3", "Hours": None, "Deliverable": None, "key": "c"},
+]
+
+
+def test_find_exact_before_case_folded():
+    index = lookup.TaskIndex(items)
+    assert [item["key"] for item in index.find("molly gray: session 3")] == ["c"]
+    assert [item["key"] for item in index.find("MOLLY GRAY: SESSION 3")] == ["a", "b", "c"]
+    assert index.find("Nobody") == []
+    assert [item["key"] for item in index.unfinished()] == ["c"]
+
+
+def test_prioritize():
+    matches = items[:2]
+    assert lookup.prioritize(matches) is None
+    assert lookup.prioritize(matches, prioritize_undelivered=True)["key"] == "b"
+    assert lookup.prioritize(matches, prioritize_delivered=True)["key"] == "a"
+
+
+def test_similar_names():
+    index = lookup.TaskIndex(
+        items + [
+            {"Date": "2022-08-18 18-30", "Task": "Molly Gray: Session 4", "Hours": 1.0, "Deliverable": None, "key": "d"},
+            {"Date": "2022-08-19 18-30", "Task": "Molly Tutoring Session 3", "Hours": 1.0, "Deliverable": None, "key": "e"},
+        ]
+    )
+
+    # Typos resolve to the clear winner, one spelling per name ignoring case
+    similar = index.similar("Molly Gray Sesion 3")
+    assert [name for name, _ in similar][0] == "Molly Gray: Session 3"
+    assert lookup.best_match(similar, "Molly Gray Sesion 3") == "Molly Gray: Session 3"
+
+    # Partial names close to several are only suggested
+    similar = index.similar("molly session 3")
+    assert lookup.best_match(similar, "molly session 3") is None
+    assert {name for name, _ in similar} == {
+        "Molly Gray: Session 3", "Molly Gray: Session 4", "Molly Tutoring Session 3"
+    }
+
+    # Other sessions are only suggested, however close
+    similar = index.similar("Molly Gray: Session 5")
+    assert similar[0][1] > lookup.min_similarity
+    assert lookup.best_match(similar, "Molly Gray: Session 5") is None
+
+    assert index.similar("xyz") == []
+
+
+def test_writes_never_guess_the_task(tmp_path, monkeypatch, base):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    base.put(items[0])
+
+    assert cli._query_db("Molly Gray Sesion 3") is False
+    assert cli._query_db("Molly Gray Sesion 3", use_closest=True).key == "a"
+    assert cli._query_db("Molly Gray: Session 4", use_closest=True) is False
@@ -1,4 +1,7 @@
+import time
+
 import export
+from pdfclass import PDF
 
 tasks = [
     {
@@ -78,3 +81,30 @@ monthyear = "8-2022"
 
 def test_export_tasks():
     export.export_tasks(tasks, monthyear)
+
+
+def test_export_range(tmp_path):
+    month_tasks = {"7-2022": tasks[:4], "8-2022": tasks}
+    export.export_range(month_tasks, path=str(tmp_path))
+
+
+def test_render_table_benchmark():
+    """10,000 rows should render in seconds, across pages, without any API calls."""
+    table_data = [["Date", "Task", "Hours", "Deliverable"]]
+    for idx in range(10_000):
+        task = tasks[idx % len(tasks)]
+        table_data.append(
+            [task["Date"], task["Task"], str(task["Hours"]), task["Deliverable"][:45] + "..."]
+        )
+
+    pdf = PDF(format='letter')
+    pdf.add_page()
+    pdf.set_font("Times", size=11)
+
+    start = time.perf_counter()
+    pdf.render_table(table_data, title="Benchmark", cell_width=[30, 50, 15, 93])
+    pdf.output()
+    elapsed = time.perf_counter() - start
+
+    assert pdf.page > 1
+    assert elapsed < 15
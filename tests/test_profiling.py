@@ -0,0 +1,35 @@
+import json
+
+import profiling
+
+
+def test_profiling_records_phases_and_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "enabled", True)
+    monkeypatch.setattr(profiling, "phases", {})
+    monkeypatch.setattr(profiling, "http_requests", {})
+    monkeypatch.setattr(profiling, "events", [])
+
+    @profiling.timed("work")
+    def work():
+        profiling.count_request("Bitly", 10, profiling.payload_size({"link": "x"}))
+        return 1
+
+    assert work() + work() == 2
+
+    summary = profiling.summary()
+    assert summary["phases"]["work"]["calls"] == 2
+    assert summary["requests"]["Bitly"] == {"requests": 2, "bytes_sent": 20, "bytes_received": 26}
+
+    path = tmp_path / "trace.json"
+    profiling.write_trace(str(path))
+    assert [event["name"] for event in json.loads(path.read_text())["traceEvents"]] == ["work", "work"]
+
+
+def test_profiling_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(profiling, "phases", {})
+    monkeypatch.setattr(profiling, "http_requests", {})
+
+    profiling.timed("work")(lambda: None)()
+    profiling.count_request("Bitly", 10, 10)
+    assert profiling.phases == {} and profiling.http_requests == {}
+    assert profiling.payload_size({"a": 1}) == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from records import TaskRecord
+from display import display_tasks
+
+
+item = {"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.38, "Deliverable": None, "key": "a"}
+
+
+def test_round_trip():
+    record = TaskRecord.from_item(item)
+    assert record.seconds == 4968
+    assert record["Hours"] == 1.38
+    assert record.to_item() == item
+    assert dict(record) == item
+
+    record.set("Hours", None)
+    assert record.to_item()["Hours"] is None
+
+
+def test_read_only_views():
+    record = TaskRecord.from_item(item)
+    with pytest.raises(TypeError):
+        record["Hours"] = 2
+    with pytest.raises(AttributeError):
+        record.anything = 1
+
+    # Displaying substitutes emojis without changing the task
+    display_tasks(record)
+    assert record.deliverable is None and record.to_item() == item
+
+
+def test_hours_written_back_unchanged():
+    # Not a whole number of seconds, ex. logged with `--hours 1.333`
+    record = TaskRecord.from_item({**item, "Hours": 1.333})
+    assert record.seconds == 4799
+    assert record.to_item()["Hours"] == 1.333
+
+    record.set("Deliverable", "link")
+    assert TaskRecord.from_item(record.to_item())["Hours"] == 1.333
@@ -0,0 +1,24 @@
+import repl
+
+
+COMMANDS = {"deliver": ["--key"], "log": ["--page", "--limit"]}
+TASKS = ["Write Report", "Write Proposal", "Review"]
+
+
+def complete(line: str) -> list[str]:
+    args, current = repl.split_argument(line)
+    return repl.complete_argument(args, current, COMMANDS, ["--refresh"], TASKS, ["abc123", "xyz789"])
+
+
+def test_split_argument():
+    assert repl.split_argument('deliver "Write re') == (["deliver"], "Write re")
+    assert repl.split_argument('deliver "Write Report" ht') == (["deliver", "Write Report"], "ht")
+    assert repl.split_argument("") == ([], "")
+
+
+def test_complete_argument():
+    assert complete("de") == ["deliver"]
+    assert complete("--re") == ["--refresh"]
+    assert complete('deliver "Write ') == ["Write Proposal", "Write Report"]
+    assert complete("deliver x --key a") == ["abc123"]
+    assert complete("log --l") == ["--limit"]
@@ -0,0 +1,44 @@
+import search
+from config import Config
+
+
+def test_tokenize_splits_links():
+    assert search.tokenize("Feedback doc: https://docs.google.com/d/a_b") == [
+        "feedback", "doc", "https", "docs", "google", "com", "d", "a", "b"
+    ]
+
+
+def test_ranked_hits(tmp_path, monkeypatch, make_record):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    index = search.MonthIndex("work_log_8_2022")
+    index.rebuild(
+        [
+            make_record("Send Chris feedback", deliverable="https://docs.google.com/feedback-doc", key="a"),
+            make_record("Feedback call", key="b"),
+            make_record("Write docs", deliverable="Notes for Chris", key="c"),
+            make_record("Unrelated", key="d"),
+        ]
+    )
+
+    hits = search.search("chris feedback doc", [index])
+    assert [hit.record.key for hit in hits] == ["a", "c", "b"]
+    assert hits[0].matched == 3 and hits[0].monthyear == "8-2022"
+    assert search.search("nothing", [index]) == []
+
+
+def test_writes_update_saved_indexes(tmp_path, monkeypatch, make_record):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    search.record("work_log_8_2022", added=[make_record("Figma mockups", key="a")])
+    assert not search.MonthIndex("work_log_8_2022").exists  # left for the first search
+
+    index = search.MonthIndex("work_log_8_2022")
+    index.rebuild([make_record("Figma mockups", key="a")])
+    index.save()
+
+    search.record("work_log_8_2022", [make_record("Figma mockups", key="a")], [make_record("Figma mockups", key="b")])
+    search.record("work_log_8_2022", added=[make_record("Logo", deliverable="https://figma.com/file/x", key="b")])
+
+    index = search.MonthIndex("work_log_8_2022")
+    assert index.fresh()  # the month has ended
+    assert [hit.record.key for hit in search.search("figma", [index])] == ["b"]
+    assert "mockups" not in index.postings
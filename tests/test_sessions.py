@@ -0,0 +1,22 @@
+import sessions
+from config import Config
+
+
+def test_sessions_are_shared_per_host():
+    bitly = sessions.session("https://api-ssl.bitly.com/v4/shorten")
+    assert sessions.session("https://api-ssl.bitly.com/v4/expand") is bitly
+    assert sessions.session("https://capitalize-my-title.p.rapidapi.com/title/x") is not bitly
+
+    adapter = bitly.get_adapter("https://api-ssl.bitly.com/v4/shorten")
+    assert adapter._pool_maxsize == Config.http_pool_size
+    assert adapter.max_retries.total == Config.http_retries
+
+
+def test_request_uses_configured_timeout(monkeypatch):
+    session = sessions.session("https://example.com")
+    calls = []
+    monkeypatch.setattr(session, "request", lambda method, url, **kwargs: calls.append(kwargs))
+
+    sessions.request("GET", "https://example.com/path")
+    sessions.request("GET", "https://example.com/path", timeout=1)
+    assert [call["timeout"] for call in calls] == [Config.http_timeout, 1]
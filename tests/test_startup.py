@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds the project may add on top of typer when importing the CLI
+IMPORT_BUDGET_MS = 100
+
+# Only needed by specific commands, never by clockin or clockout
+HEAVY_MODULES = ("pandas", "fpdf", "requests", "deta", "export", "pdfclass", "bitly")
+
+
+def import_times(code: str) -> tuple[dict[str, int], str]:
+    """Cumulative import time in microseconds of each module, and stdout."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd = REPO_DIR,
+        capture_output = True,
+        text = True,
+        check = True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times, result.stdout
+
+
+def test_heavy_modules_not_imported():
+    _, stdout = import_times(
+        f"import sys, cli; print(','.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    )
+    assert stdout.strip() == ""
+
+
+def test_import_time_budget():
+    # Take the best of a few runs to smooth out noise
+    project_ms = []
+    for _ in range(3):
+        times, _ = import_times("import typer, cli")
+        project_ms.append(times["cli"] / 1000)
+
+    assert min(project_ms) < IMPORT_BUDGET_MS
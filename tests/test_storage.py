@@ -0,0 +1,113 @@
+import sqlite3
+
+import pytest
+
+import storage
+
+
+def test_sqlite_put_get_delete(base):
+    assert base.get("missing") is None
+    assert base.fetch().items == []
+
+    item = base.put({"Date": "2022-08-15 18-30", "Task": "Session", "Hours": None, "Deliverable": None})
+    assert len(item["key"]) == 12
+    assert base.get(item["key"]) == item
+
+    base.delete(item["key"])
+    assert base.get(item["key"]) is None
+
+
+def test_sqlite_sees_tables_created_elsewhere(tmp_path):
+    path = tmp_path / "work_log.db"
+    reader = storage.SQLiteBase("work_log_8_2022", connection=sqlite3.connect(path))
+    assert reader.get("a") is None and reader.fetch().items == []
+
+    # Another process logs the month's first task
+    writer = storage.SQLiteBase("work_log_8_2022", connection=sqlite3.connect(path))
+    writer.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.0, "Deliverable": None}, "a")
+
+    assert reader.get("a")["Task"] == "A" and reader.fetch().count == 1
+
+
+def test_sqlite_fetch_queries(base):
+    base.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.5, "Deliverable": None}, "a")
+    base.put({"Date": "2022-08-16 18-30", "Task": "A", "Hours": None, "Deliverable": None}, "b")
+    base.put({"Date": "2022-08-17 18-30", "Task": "B", "Hours": 2.0, "Deliverable": "x"}, "c")
+
+    assert [item["key"] for item in base.fetch({"Task": "A"}).items] == ["a", "b"]
+    assert [item["key"] for item in base.fetch({"Hours": None}).items] == ["b"]
+    assert [item["key"] for item in base.fetch([{"Task": "B"}, {"Hours": None}]).items] == ["b", "c"]
+
+    page = base.fetch(limit=2)
+    assert page.count == 2 and page.last == "b"
+    assert [item["key"] for item in base.fetch(limit=2, last=page.last).items] == ["c"]
+
+
+def test_sqlite_update_and_extra_fields(base):
+    base.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": None, "Deliverable": None}, "a")
+    base.update({"Hours": 2.5, "Note": "extra"}, "a")
+
+    item = base.get("a")
+    assert item["Hours"] == 2.5 and item["Note"] == "extra"
+    assert base.fetch({"Note": "extra"}).count == 1
+
+
+def test_iterate_follows_pages(base):
+    for idx in range(5):
+        base.put({"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.0, "Deliverable": None}, f"k{idx}")
+
+    assert base.fetch(limit=2).count == 2
+    assert [item["key"] for item in base.iterate(page_size=2)] == ["k0", "k1", "k2", "k3", "k4"]
+
+
+def test_sqlite_put_many(base):
+    items = base.put_many(
+        [{"Date": "2022-08-15 18-30", "Task": "A", "Hours": 1.0, "Deliverable": None, "key": "a"}]
+        + [{"Date": "2022-08-16 18-30", "Task": "B", "Hours": None, "Deliverable": None}] * 2
+    )
+
+    assert items[0]["key"] == "a" and len({item["key"] for item in items}) == 3
+    assert base.fetch().count == 3
+
+
+def test_sqlite_insert_only_if_absent(base):
+    base.insert({"Date": "2022-08-15 18-30", "Task": "A", "Hours": None, "Deliverable": None}, storage.active_key)
+
+    with pytest.raises(storage.KeyExistsError):
+        base.insert({"Date": "2022-08-16 18-30", "Task": "B", "Hours": None, "Deliverable": None}, storage.active_key)
+
+    assert base.get(storage.active_key)["Task"] == "A"
+
+
+def test_sqlite_update_increments(base):
+    base.put({"Date": None, "Task": None, "Hours": None, "Deliverable": None, "Seconds": 10, "Names": {}}, "s")
+    base.update({"Seconds": storage.Increment(5), "Names.A": storage.Increment(3)}, "s")
+    base.update({"Names.A": storage.Increment(-1), "Names.B": storage.Increment()}, "s")
+
+    item = base.get("s")
+    assert item["Seconds"] == 15 and item["Names"] == {"A": 2, "B": 1}
+
+    with pytest.raises(storage.KeyMissingError):
+        base.update({"Seconds": storage.Increment(1)}, "missing")
+
+
+def test_deta_put_many_reports_failed_chunks():
+    class FlakyDeta:
+        calls = 0
+
+        def put_many(self, chunk):
+            self.calls += 1
+            if self.calls == 2:
+                raise Exception("timed out")
+            return {"processed": {"items": chunk}}
+
+    base = storage.DetaBase("work_log_8_2022")
+    base._deta_base = FlakyDeta()
+    items = [{"Task": f"T{idx}"} for idx in range(storage.put_many_limit * 2 + 1)]
+
+    with pytest.raises(storage.PutManyError) as error:
+        base.put_many(items)
+
+    # Only the second request's items failed, and the rest were stored
+    assert error.value.failed == list(range(storage.put_many_limit, storage.put_many_limit * 2))
+    assert len(error.value.stored) == storage.put_many_limit + 1
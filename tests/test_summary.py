@@ -0,0 +1,73 @@
+import cli
+import storage
+import summary
+from config import Config
+
+
+def test_changes_are_net_of_removed_tasks(make_record):
+    unfinished = make_record("A.b")
+    finished = make_record("A.b", hours=1.5, deliverable="link")
+
+    assert summary.changes(added=[unfinished]) == {
+        "Tasks": 1, "Unfinished": 1, "Undelivered": 1
+    }
+    assert summary.changes([unfinished], [finished]) == {
+        "Seconds": 5400, "Unfinished": -1, "Undelivered": -1, "TaskSeconds.A%2Eb": 5400
+    }
+
+
+def test_record_matches_rebuild(base, make_record):
+    records = [make_record("A", hours=1.0), make_record("B"), make_record("A", hours=0.5, deliverable="x")]
+    for record in records:
+        base.put(record.to_item())
+        summary.record(base, added=[record])  # the first builds the summary
+
+    loaded = summary.load(base)
+    rebuilt = summary.rebuild(base)
+    assert all(loaded[field] == rebuilt[field] for field in (*summary.counters, "TaskSeconds"))
+    assert (loaded["Tasks"], loaded["Unfinished"], loaded["Undelivered"]) == (3, 1, 2)
+    assert summary.hours(loaded) == 1.5
+    assert summary.task_hours(loaded) == {"A": 1.5}
+
+    # The summary itself isn't a task
+    assert len(list(base.records())) == 3
+    assert base.get_record(storage.summary_key) is None
+
+
+def test_empty_months_get_no_summary(base, monkeypatch):
+    deleted = []
+    monkeypatch.setattr(base, "delete", deleted.append)
+
+    assert summary.load(base)["Tasks"] == 0
+    assert summary.rebuild(base)["Tasks"] == 0
+    assert base.get(storage.summary_key) is None and deleted == []
+
+
+def test_tasks_cant_take_the_summary_key(tmp_path, monkeypatch, base, make_record):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    task = make_record("A", hours=1.0)
+    base.put(task.to_item(), "a")
+    summary.record(base, added=[task])
+
+    cli.modify("A", "key", storage.summary_key, key=None)
+    assert summary.load(base)["Tasks"] == 1
+    assert [task.key for task in base.records()] == ["a"]
+
+
+def test_active_task_counted_once_clocked_out(tmp_path, monkeypatch, base):
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cli, "work_log", base)
+    monkeypatch.setattr(storage, "base", lambda name: base)
+    updates = []
+    update = base.update
+    monkeypatch.setattr(base, "update", lambda *args: updates.append(args) or update(*args))
+
+    # Clocking in is only the insert into the active slot
+    cli.clockin("A", hours=0, date="no", deliver="no", titlecase=False)
+    assert updates == [] and base.get(storage.summary_key) is None
+    assert summary.rebuild(base, missing=True)["Unfinished"] == 1
+
+    cli.clockout(hours=1.5, deliver=None, key=None)
+    loaded = summary.load(base)
+    assert (loaded["Tasks"], loaded["Unfinished"], summary.hours(loaded)) == (1, 0, 1.5)
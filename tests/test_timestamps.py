@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+import timestamps
+from display import _reorder_dicts
+
+
+def test_parse_matches_strptime():
+    for date in ("2022-08-15 18-30", "2022-12-01 00-05", "1999-01-31 23-59"):
+        assert timestamps.parse(date) == datetime.strptime(date, "%Y-%m-%d %H-%M")
+    assert timestamps.format(datetime(2022, 8, 15, 18, 30)) == "2022-08-15 18-30"
+
+    for invalid in ("2022-13-15 18-30", "2022-08-15 18:30"):
+        with pytest.raises(ValueError):
+            timestamps.parse(invalid)
+
+
+def test_reorder_dicts():
+    tasks = [
+        {"key": "b", "Task": "B", "Hours": 1, "Deliverable": None, "Date": "2022-08-16 18-30"},
+        {"key": "a", "Task": "A", "Hours": 1, "Deliverable": None, "Date": "2022-08-15 18-30"},
+    ]
+    reordered = _reorder_dicts(tasks)
+    assert [task["key"] for task in reordered] == ["a", "b"]
+    assert list(reordered[0]) == ["Date", "Task", "Hours", "Deliverable", "key"]
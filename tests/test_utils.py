@@ -10,3 +10,32 @@ def test_bitly():
 def test_capitalization():
     assert utils.capitalize_title("this is a title", method_force="smart") == "This Is a Title"
     assert utils.capitalize_title("this is a title", method_force="default") == "This Is A Title"
+
+
+def test_shorten_links_cached_and_deduplicated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.Config, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(bitly, "short_link_cache", bitly.cache.PersistentLRU("short_links", 10))
+
+    requested = []
+    def fake_request(long_link):
+        requested.append(long_link)
+        return long_link if "fail" in long_link else "https://bit.ly/" + long_link[-1]
+    monkeypatch.setattr(bitly, "_request_short_link", fake_request)
+
+    links = ["https://a.com/1", "https://a.com/2", "https://a.com/1", "https://fail.com/3"]
+    assert bitly.shorten_links(links) == {
+        "https://a.com/1": "https://bit.ly/1",
+        "https://a.com/2": "https://bit.ly/2",
+        "https://fail.com/3": "https://fail.com/3"
+    }
+    assert sorted(requested) == ["https://a.com/1", "https://a.com/2", "https://fail.com/3"]
+
+    # Only the failed link is requested again
+    requested.clear()
+    bitly.shorten_links(links)
+    assert requested == ["https://fail.com/3"]
+
+
+def test_month_range():
+    assert utils.parse_monthyear("07-2022") == (7, 2022)
+    assert utils.month_range("11-2022", "2-2023") == [(11, 2022), (12, 2022), (1, 2023), (2, 2023)]
@@ -0,0 +1,38 @@
+"""
+Parse and format task dates. The default `%Y-%m-%d %H-%M` layout is parsed by
+slicing the string instead of going through `strptime`, and parsed values are
+memoized, so sorting and displaying long logs isn't dominated by date parsing.
+"""
+# Local imports
+from datetime import datetime
+import functools
+
+# Project modules
+from config import Config
+
+
+# Layout with a fast path, ex. '2022-08-15 18-30'
+_fast_format = "%Y-%m-%d %H-%M"
+
+
+@functools.lru_cache(maxsize=65536)
+def parse(date: str) -> datetime:
+    """Parses a task's `Date`, in the format set in config.ini."""
+    if (
+        Config.dt_format == _fast_format
+        and len(date) == 16
+        and date[4] == '-' and date[7] == '-' and date[10] == ' ' and date[13] == '-'
+    ):
+        fields = (date[0:4], date[5:7], date[8:10], date[11:13], date[14:16])
+        if all(field.isascii() and field.isdigit() for field in fields):
+            try:
+                return datetime(*map(int, fields))
+            except ValueError:  # ex. month 13, left to strptime to report
+                pass
+
+    return datetime.strptime(date, Config.dt_format)
+
+
+def format(moment: datetime) -> str:
+    """Formats a moment as a task's `Date`, in the format set in config.ini."""
+    return moment.strftime(Config.dt_format)
@@ -1,52 +1,115 @@
 """
 Utils to be used by other modules, including title capitalization, etc.
 """
-# Non-local imports
-import requests
-
 # Local imports
 import enum
 
 # Project modules
-import keys 
+import keys
 from config import Config
+import cache
+import profiling
+import sessions
+
+
+# ---- Dates ----
+
+
+def parse_monthyear(monthyear: str) -> tuple[int, int]:
+    """Parses a month like '7-2022' (or '07-2022') into `(7, 2022)`."""
+    month, year = (int(part) for part in monthyear.strip().split('-'))
+    if not 1 <= month <= 12:
+        raise ValueError(f"'{monthyear}' is not a valid month.")
+
+    return month, year
+
+
+def month_range(start: str, end: str) -> list[tuple[int, int]]:
+    """Every `(month, year)` from `start` through `end`, ex. '1-2022' to '12-2022'."""
+    start_month, start_year = parse_monthyear(start)
+    end_month, end_year = parse_monthyear(end)
+
+    months = []
+    for index in range(start_year * 12 + start_month - 1, end_year * 12 + end_month):
+        months.append((index % 12 + 1, index // 12))
+
+    if not months:
+        raise ValueError(f"'{start}' is after '{end}'.")
+
+    return months
 
 
 # ---- Language ----
 
 
+# Smart capitalizations already requested from RapidAPI, by original title
+capitalization_cache = cache.PersistentLRU("capitalizations", Config.max_capitalizations)
+
+
 class CapitalizationMethod(enum.Enum):
     SMART = enum.auto()
     DEFAULT = enum.auto()
 
 
-def capitalize_title(title: str, method_force: str = None) -> str:
-    if not isinstance(title, str):
-        raise Exception("You can only capitalize string titles.")
+def _capitalization_method(method_force: str = None) -> CapitalizationMethod:
+    if not method_force:
+        if Config.smart_cap_preference:
+            return CapitalizationMethod.SMART
+        return CapitalizationMethod.DEFAULT
 
-    # Determine method
+    if method_force.lower() == "smart" or Config.smart_cap_preference:
+        return CapitalizationMethod.SMART
 
-    if not method_force:
-        method = Config.smart_cap_preference
-    else:
-        if method_force.lower() == "smart" or Config.smart_cap_preference:
-            method = CapitalizationMethod.SMART
-        else:
-            method = CapitalizationMethod.DEFAULT
+    return CapitalizationMethod.DEFAULT
 
-    # If smart capitalization is disabled
-    if method == CapitalizationMethod.DEFAULT:
-        return title.title()
 
+def _request_capitalization(title: str) -> str:
+    """Smart capitalizes `title` using the Capitalize My Title RapidAPI app."""
     # Separate words with %20
     title = title.replace(' ', '%20')
 
-    # Make the request
     url = f"https://capitalize-my-title.p.rapidapi.com/title/{title}"
     headers = {
         "X-RapidAPI-Key": keys.RapidAPI.api_key,
         "X-RapidAPI-Host": "capitalize-my-title.p.rapidapi.com"
     }
-    response = requests.request("GET", url, headers=headers)
+    response = sessions.request("GET", url, headers=headers)
+    profiling.count_request("RapidAPI", len(url), len(response.content))
 
     return response.json()['data']['output']
+
+
+def capitalize_title(title: str, method_force: str = None) -> str:
+    """
+    Capitalizes a title, smartly if enabled in config.ini or forced. Smart
+    capitalizations are cached on disk, so each title is only requested once.
+    """
+    return capitalize_titles([title], method_force=method_force)[0]
+
+
+@profiling.timed("capitalization")
+def capitalize_titles(titles: list[str], method_force: str = None) -> list[str]:
+    """
+    Capitalizes many titles in one pass. Each distinct title missing from the
+    cache is requested once, and the cache is written once at the end.
+    """
+    if not all(isinstance(title, str) for title in titles):
+        raise Exception("You can only capitalize string titles.")
+
+    # If smart capitalization is disabled
+    if _capitalization_method(method_force) == CapitalizationMethod.DEFAULT:
+        return [title.title() for title in titles]
+
+    capitalized = {}
+    for title in dict.fromkeys(titles):  # distinct, in order
+        if (cached := capitalization_cache.get(title)) is not None:
+            capitalized[title] = cached
+
+    requested = {
+        title: _request_capitalization(title)
+        for title in dict.fromkeys(titles) if title not in capitalized
+    }
+    capitalization_cache.set_many(requested)
+    capitalized.update(requested)
+
+    return [capitalized[title] for title in titles]